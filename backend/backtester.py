@@ -1,12 +1,13 @@
 import os
 from io import BytesIO
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional
 
 import numpy as np
 import pandas as pd
+from pandas.tseries.api import guess_datetime_format
 
-from forecaster import forecast_occupancy, load_completion_ratios
+from forecaster import COMPLETION_RATIOS_PATH, forecast_occupancy_batch, load_completion_ratios
 
 
 DEFAULT_BACKTEST_DATA_PATH = os.path.join(
@@ -18,21 +19,28 @@ DEFAULT_BACKTEST_DATA_PATH = os.path.join(
 
 SUPPORTED_UPLOAD_EXTENSIONS = {".csv", ".xlsx", ".xls"}
 
-
-def _to_ddmmyy(value: datetime) -> str:
-    return value.strftime("%d%m%y")
-
-
-def _safe_float(value: object) -> float:
-    try:
-        return float(value)
-    except Exception:
-        return np.nan
+DETAIL_ROUNDED_COLUMNS = (
+    "current_occupancy_pct",
+    "actual_final_occupancy_pct",
+    "predicted_final_occupancy_pct",
+    "error",
+    "abs_error",
+    "squared_error",
+)
 
 
 def _parse_datetime_series(series: pd.Series, date_format: Optional[str] = None) -> pd.Series:
     if date_format:
-        return pd.to_datetime(series.astype(str), format=date_format, errors="coerce")
+        return pd.to_datetime(series.astype(str), format=date_format, errors="coerce", cache=True)
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    # Lock the format from the first value so the rest parse on the fast path.
+    non_null = series.dropna()
+    guessed_format = guess_datetime_format(str(non_null.iloc[0]), dayfirst=True) if not non_null.empty else None
+    if guessed_format:
+        return pd.to_datetime(series.astype(str), format=guessed_format, errors="coerce", cache=True)
 
     parsed = pd.to_datetime(series, errors="coerce", dayfirst=True)
     return parsed
@@ -62,16 +70,23 @@ def _build_metrics(df: pd.DataFrame) -> dict:
             "within_10_pct": None,
         }
 
-    mae = float(df["abs_error"].mean())
-    rmse = float(np.sqrt(df["squared_error"].mean()))
-    bias = float(df["error"].mean())
+    # Read each column once and derive every metric from the same arrays.
+    error = df["error"].to_numpy(dtype=float)
+    abs_error = df["abs_error"].to_numpy(dtype=float)
+    squared_error = df["squared_error"].to_numpy(dtype=float)
+    actual = df["actual_final_occupancy_pct"].to_numpy(dtype=float)
+    ape = df["ape"].to_numpy(dtype=float)
 
-    nonzero_actual = df[df["actual_final_occupancy_pct"] > 0]
-    mape = float(nonzero_actual["ape"].mean() * 100.0) if not nonzero_actual.empty else None
+    mae = float(np.nanmean(abs_error))
+    rmse = float(np.sqrt(np.nanmean(squared_error)))
+    bias = float(np.nanmean(error))
 
-    within_3 = float((df["abs_error"] <= 3.0).mean() * 100.0)
-    within_5 = float((df["abs_error"] <= 5.0).mean() * 100.0)
-    within_10 = float((df["abs_error"] <= 10.0).mean() * 100.0)
+    nonzero_ape = ape[actual > 0]
+    mape = float(np.nanmean(nonzero_ape) * 100.0) if nonzero_ape.size else None
+
+    within_3 = float(np.mean(abs_error <= 3.0) * 100.0)
+    within_5 = float(np.mean(abs_error <= 5.0) * 100.0)
+    within_10 = float(np.mean(abs_error <= 10.0) * 100.0)
 
     return {
         "count": int(len(df)),
@@ -89,10 +104,38 @@ def _build_breakdown(df: pd.DataFrame, group_column: str) -> list[dict]:
     if df.empty:
         return []
 
+    # Same metrics as _build_metrics, computed for every group in one groupby.
+    grouped = df.assign(
+        nonzero_ape=df["ape"].where(df["actual_final_occupancy_pct"] > 0),
+        within_3=(df["abs_error"] <= 3.0) * 100.0,
+        within_5=(df["abs_error"] <= 5.0) * 100.0,
+        within_10=(df["abs_error"] <= 10.0) * 100.0,
+    ).groupby(group_column).agg(
+        row_count=("error", "size"),
+        mae=("abs_error", "mean"),
+        mse=("squared_error", "mean"),
+        mape=("nonzero_ape", "mean"),
+        bias=("error", "mean"),
+        within_3_pct=("within_3", "mean"),
+        within_5_pct=("within_5", "mean"),
+        within_10_pct=("within_10", "mean"),
+    )
+
     rows = []
-    for group_value, group_df in df.groupby(group_column):
-        metrics = _build_metrics(group_df)
-        rows.append({group_column: group_value, **metrics})
+    for group_value, metrics in zip(grouped.index.tolist(), grouped.itertuples(index=False)):
+        rows.append(
+            {
+                group_column: group_value,
+                "count": int(metrics.row_count),
+                "mae": round(float(metrics.mae), 4),
+                "rmse": round(float(np.sqrt(metrics.mse)), 4),
+                "mape": round(float(metrics.mape) * 100.0, 4) if pd.notna(metrics.mape) else None,
+                "bias": round(float(metrics.bias), 4),
+                "within_3_pct": round(float(metrics.within_3_pct), 4),
+                "within_5_pct": round(float(metrics.within_5_pct), 4),
+                "within_10_pct": round(float(metrics.within_10_pct), 4),
+            }
+        )
 
     if group_column == "days_out":
         rows.sort(key=lambda item: item["days_out"])
@@ -102,6 +145,19 @@ def _build_breakdown(df: pd.DataFrame, group_column: str) -> list[dict]:
     return rows
 
 
+def _to_json_records(df: pd.DataFrame) -> list[dict]:
+    # Missing values become None in a single object cast + mask.
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def _read_csv_fast(source) -> pd.DataFrame:
+    # Arrow's multi-threaded parser; fall back to the C engine when pyarrow is not installed.
+    try:
+        return pd.read_csv(source, engine="pyarrow")
+    except ImportError:
+        return pd.read_csv(source)
+
+
 def load_uploaded_dataframe(file_bytes: bytes, filename: str) -> pd.DataFrame:
     extension = os.path.splitext(filename)[1].lower()
     if extension not in SUPPORTED_UPLOAD_EXTENSIONS:
@@ -116,7 +172,7 @@ def load_uploaded_dataframe(file_bytes: bytes, filename: str) -> pd.DataFrame:
 def get_uploaded_preview(file_bytes: bytes, filename: str, sample_rows: int = 5) -> dict:
     df = load_uploaded_dataframe(file_bytes=file_bytes, filename=filename)
     columns = [str(column) for column in df.columns]
-    rows_preview = df.head(max(1, sample_rows)).replace({np.nan: None}).to_dict(orient="records")
+    rows_preview = _to_json_records(df.head(max(1, sample_rows)))
 
     return {
         "filename": filename,
@@ -189,14 +245,16 @@ def prepare_uploaded_backtest_dataset(
         if total_rooms_available <= 0:
             raise ValueError("total_rooms_available must be greater than 0 in raw data mode")
 
-        df = source_df.copy()
-        df["stay_date_dt"] = _parse_datetime_series(df[stay_date_col], stay_date_format)
-        df["booking_date_dt"] = _parse_datetime_series(df[booking_date_col], booking_date_format)
-
-        if rooms_per_row_col:
-            df["rooms_units"] = pd.to_numeric(df[rooms_per_row_col], errors="coerce")
-        else:
-            df["rooms_units"] = 1.0
+        # Only the three mapped columns are needed; avoid copying the whole upload.
+        df = pd.DataFrame(
+            {
+                "stay_date_dt": _parse_datetime_series(source_df[stay_date_col], stay_date_format),
+                "booking_date_dt": _parse_datetime_series(source_df[booking_date_col], booking_date_format),
+                "rooms_units": (
+                    pd.to_numeric(source_df[rooms_per_row_col], errors="coerce") if rooms_per_row_col else 1.0
+                ),
+            }
+        )
 
         df = df.dropna(subset=["stay_date_dt", "booking_date_dt", "rooms_units"])
         df = df[df["rooms_units"] > 0]
@@ -205,38 +263,27 @@ def prepare_uploaded_backtest_dataset(
         if df.empty:
             raise ValueError("No valid rows found after raw data cleaning")
 
-        aggregated_rows: list[dict] = []
-        for stay_date_dt, stay_group in df.groupby("stay_date_dt"):
-            final_rooms = float(stay_group["rooms_units"].sum())
-            final_occupancy = final_rooms / float(total_rooms_available) * 100.0
+        # One snapshot per (stay_date, booking_date). This groupby's key sort is the only
+        # sort needed: rows come out ordered by stay date, then booking date, so the
+        # per-stay cumsum below runs in booking order without re-sorting.
+        bookings_by_date = df.groupby(["stay_date_dt", "booking_date_dt"], as_index=False)["rooms_units"].sum()
+        stay_groups = bookings_by_date.groupby("stay_date_dt", sort=False)["rooms_units"]
+        cum_rooms = stay_groups.cumsum()
+        final_rooms = stay_groups.transform("sum")
 
-            bookings_by_date = (
-                stay_group.groupby("booking_date_dt", as_index=False)["rooms_units"]
-                .sum()
-                .sort_values("booking_date_dt")
-            )
-            bookings_by_date["cum_rooms"] = bookings_by_date["rooms_units"].cumsum()
-
-            for entry in bookings_by_date.itertuples(index=False):
-                snapshot_dt = getattr(entry, "booking_date_dt")
-                days_out = int((stay_date_dt - snapshot_dt).days)
-                if days_out < 0 or days_out > 30:
-                    continue
-
-                current_rooms = float(getattr(entry, "cum_rooms"))
-                current_occupancy = current_rooms / float(total_rooms_available) * 100.0
-
-                aggregated_rows.append(
-                    {
-                        "stay_date_dt": stay_date_dt,
-                        "days_out": days_out,
-                        "current_occupancy": current_occupancy,
-                        "final_occupancy": final_occupancy,
-                        "day_type": "weekday" if stay_date_dt.weekday() <= 3 else "weekend",
-                    }
-                )
-
-        aggregated_df = pd.DataFrame(aggregated_rows)
+        stay_dates = bookings_by_date["stay_date_dt"]
+        days_out = (stay_dates - bookings_by_date["booking_date_dt"]).dt.days
+        in_window = (days_out >= 0) & (days_out <= 30)
+
+        aggregated_df = pd.DataFrame(
+            {
+                "stay_date_dt": stay_dates[in_window],
+                "days_out": days_out[in_window],
+                "current_occupancy": cum_rooms[in_window] / float(total_rooms_available) * 100.0,
+                "final_occupancy": final_rooms[in_window] / float(total_rooms_available) * 100.0,
+                "day_type": pd.Categorical(np.where(stay_dates[in_window].dt.weekday <= 3, "weekday", "weekend")),
+            }
+        )
         if aggregated_df.empty:
             raise ValueError("No usable snapshot rows were generated from raw data (days_out must be 0-30)")
 
@@ -255,7 +302,7 @@ def load_backtest_dataset(csv_path: Optional[str] = None) -> pd.DataFrame:
     if not os.path.exists(path):
         raise FileNotFoundError(f"Backtest dataset not found: {path}")
 
-    df = pd.read_csv(path)
+    df = _read_csv_fast(path)
     required_cols = {"stay_date", "days_out", "final_occupancy", "day_type"}
     missing = required_cols - set(df.columns)
     if missing:
@@ -269,19 +316,31 @@ def load_backtest_dataset(csv_path: Optional[str] = None) -> pd.DataFrame:
                 "Backtest dataset must contain either 'current_occupancy' or 'rooms_booked_cumulative'"
             )
 
+    # DDMMYYYY stay dates are read back as integers, dropping the leading zero for days 1-9.
     df["stay_date_dt"] = pd.to_datetime(
-        df["stay_date"].astype(str),
+        df["stay_date"].astype(str).str.zfill(8),
         format="%d%m%Y",
         errors="coerce",
+        cache=True,
     )
     df["days_out"] = pd.to_numeric(df["days_out"], errors="coerce").astype("Int64")
     df["current_occupancy"] = pd.to_numeric(df["current_occupancy"], errors="coerce")
     df["final_occupancy"] = pd.to_numeric(df["final_occupancy"], errors="coerce")
-    df["day_type"] = df["day_type"].astype(str).str.lower().str.strip()
+    df["day_type"] = df["day_type"].astype(str).str.lower().str.strip().astype("category")
 
     df = df.dropna(subset=["stay_date_dt", "days_out", "current_occupancy", "final_occupancy"])
     df = df[(df["days_out"] >= 0) & (df["days_out"] <= 30)]
 
+    # Narrow dtypes: days_out is 0-30 and occupancies are 0-100 with few decimals.
+    # Metrics are still computed in float64.
+    df = df.astype(
+        {
+            "days_out": "int8",
+            "current_occupancy": "float32",
+            "final_occupancy": "float32",
+        }
+    )
+
     return df
 
 
@@ -312,17 +371,24 @@ def _run_backtest_on_prepared_df(
     if parsed_start and parsed_end and parsed_start > parsed_end:
         raise ValueError("start_date cannot be after end_date")
 
-    filtered_df = source_df.copy()
-    filtered_df = filtered_df[(filtered_df["days_out"] >= days_out_min) & (filtered_df["days_out"] <= days_out_max)]
+    # Compare against datetime64 scalars so the mask stays in NumPy.
+    if parsed_start is not None:
+        parsed_start = np.datetime64(parsed_start, "ns")
+    if parsed_end is not None:
+        parsed_end = np.datetime64(parsed_end, "ns")
+
+    mask = source_df["days_out"].between(days_out_min, days_out_max)
 
     if day_type != "all":
-        filtered_df = filtered_df[filtered_df["day_type"] == day_type]
+        mask &= source_df["day_type"] == day_type
 
     if parsed_start is not None:
-        filtered_df = filtered_df[filtered_df["stay_date_dt"] >= parsed_start]
+        mask &= source_df["stay_date_dt"] >= parsed_start
 
     if parsed_end is not None:
-        filtered_df = filtered_df[filtered_df["stay_date_dt"] <= parsed_end]
+        mask &= source_df["stay_date_dt"] <= parsed_end
+
+    filtered_df = source_df.loc[mask]
 
     if filtered_df.empty:
         return {
@@ -345,56 +411,52 @@ def _run_backtest_on_prepared_df(
             },
         }
 
-    ratios_df = completion_ratios_df if completion_ratios_df is not None else load_completion_ratios()
-
-    detail_rows: list[dict] = []
-    skipped_rows = 0
-
-    for row in filtered_df.itertuples(index=False):
-        stay_date_dt = getattr(row, "stay_date_dt")
-        days_out_value = int(getattr(row, "days_out"))
-        current_occ = _safe_float(getattr(row, "current_occupancy"))
-        actual_final_occ = _safe_float(getattr(row, "final_occupancy"))
-        row_day_type = str(getattr(row, "day_type")).lower().strip()
-
-        today_date_dt = stay_date_dt - timedelta(days=days_out_value)
+    ratios_df = completion_ratios_df if completion_ratios_df is not None else load_completion_ratios(COMPLETION_RATIOS_PATH)
 
-        model_input = {
-            "stay_date": _to_ddmmyy(stay_date_dt),
-            "today_date": _to_ddmmyy(today_date_dt),
-            "current_occupancy": float(current_occ),
-            "total_rooms_available": int(total_rooms_available),
-            "event_level": "none",
+    # Both dataset loaders already coerce numeric columns and normalise day_type,
+    # so columns are read as-is. The model derives day_type from the stay date,
+    # like forecast_occupancy does.
+    model_input = pd.DataFrame(
+        {
+            "days_out": filtered_df["days_out"].astype(int).to_numpy(),
+            "current_occupancy": filtered_df["current_occupancy"].to_numpy(dtype=float),
+            "day_type": np.where(filtered_df["stay_date_dt"].dt.weekday <= 3, "weekday", "weekend"),
         }
-
-        try:
-            forecast_result = forecast_occupancy(model_input, ratios_df)
-            predicted_occ = float(forecast_result["forecast_occupancy_pct"])
-        except Exception:
-            skipped_rows += 1
-            continue
-
-        error = predicted_occ - actual_final_occ
-        abs_error = abs(error)
-        squared_error = error ** 2
-        ape = (abs_error / actual_final_occ) if actual_final_occ > 0 else np.nan
-
-        detail_rows.append(
-            {
-                "stay_date": stay_date_dt.strftime("%Y-%m-%d"),
-                "day_type": row_day_type,
-                "days_out": days_out_value,
-                "current_occupancy_pct": round(float(current_occ), 4),
-                "actual_final_occupancy_pct": round(float(actual_final_occ), 4),
-                "predicted_final_occupancy_pct": round(float(predicted_occ), 4),
-                "error": round(float(error), 4),
-                "abs_error": round(float(abs_error), 4),
-                "squared_error": round(float(squared_error), 4),
-                "ape": float(ape) if pd.notna(ape) else np.nan,
-            }
-        )
-
-    details_df = pd.DataFrame(detail_rows)
+    )
+    forecast_df = forecast_occupancy_batch(
+        model_input,
+        ratios_df,
+        total_rooms_available=int(total_rooms_available),
+    )
+    skipped_rows = len(model_input) - len(forecast_df)
+
+    # Positions of the rows the model could forecast; every detail column is a plain array.
+    evaluated = forecast_df.index.to_numpy()
+    current_occ = model_input["current_occupancy"].to_numpy(dtype=float)[evaluated]
+    actual_final_occ = filtered_df["final_occupancy"].to_numpy(dtype=float)[evaluated]
+    predicted_occ = forecast_df["forecast_occupancy_pct"].to_numpy(dtype=float)
+
+    error = predicted_occ - actual_final_occ
+    abs_error = np.abs(error)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ape = np.where(actual_final_occ > 0, abs_error / actual_final_occ, np.nan)
+
+    details_df = pd.DataFrame(
+        {
+            # Kept as datetime64; only the rows returned in details are formatted.
+            "stay_date": filtered_df["stay_date_dt"].to_numpy()[evaluated],
+            "day_type": filtered_df["day_type"].to_numpy()[evaluated],
+            "days_out": forecast_df["days_out"].to_numpy(),
+            "current_occupancy_pct": current_occ,
+            "actual_final_occupancy_pct": actual_final_occ,
+            "predicted_final_occupancy_pct": predicted_occ,
+            "error": error,
+            "abs_error": abs_error,
+            "squared_error": np.square(error),
+            "ape": ape,
+        }
+    )
+    details_df = details_df.round({column: 4 for column in DETAIL_ROUNDED_COLUMNS})
 
     summary = _build_metrics(details_df)
     by_day_type = _build_breakdown(details_df, "day_type")
@@ -402,14 +464,18 @@ def _run_backtest_on_prepared_df(
 
     details_payload = []
     if include_details and not details_df.empty:
-        details_copy = details_df.copy()
+        details_copy = details_df.head(max(1, detail_limit)).copy()
+        details_copy["stay_date"] = details_copy["stay_date"].dt.strftime("%Y-%m-%d")
         details_copy["ape_pct"] = np.where(
             details_copy["ape"].notna(),
             np.round(details_copy["ape"] * 100.0, 4),
             np.nan,
         )
         details_copy = details_copy.drop(columns=["ape"])
-        details_payload = details_copy.head(max(1, detail_limit)).replace({np.nan: None}).to_dict(orient="records")
+        details_payload = _to_json_records(details_copy)
+
+    # filtered_df is non-empty here (the empty case returned early above).
+    stay_date_range = filtered_df["stay_date_dt"].agg(["min", "max"])
 
     return {
         "summary": summary,
@@ -430,8 +496,8 @@ def _run_backtest_on_prepared_df(
             "candidate_rows": int(len(filtered_df)),
             "evaluated_rows": int(len(details_df)),
             "skipped_rows": int(skipped_rows),
-            "min_stay_date": filtered_df["stay_date_dt"].min().strftime("%Y-%m-%d") if not filtered_df.empty else None,
-            "max_stay_date": filtered_df["stay_date_dt"].max().strftime("%Y-%m-%d") if not filtered_df.empty else None,
+            "min_stay_date": stay_date_range["min"].strftime("%Y-%m-%d"),
+            "max_stay_date": stay_date_range["max"].strftime("%Y-%m-%d"),
         },
     }
 
@@ -12,14 +12,17 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import PatternFill, Font, Border, Side, Color
 from openpyxl.formatting.rule import CellIsRule, ColorScaleRule, Rule
+from openpyxl.utils import get_column_letter
+import calendar
 import os
 
 # Import core forecasting functions
 from forecaster import (
     load_completion_ratios,
-    forecast_occupancy,
+    forecast_occupancy_batch,
     parse_date,
     CONFIG
 )
@@ -47,6 +50,17 @@ COLORS = {
 # EXCEL TEMPLATE GENERATOR
 # ============================================================================
 
+def _styled_cell(ws, value, font=None, border=None, number_format=None):
+    """Create a cell for a write-only worksheet with optional font, border and number format."""
+    cell = WriteOnlyCell(ws, value=value)
+    if font is not None:
+        cell.font = font
+    if border is not None:
+        cell.border = border
+    if number_format is not None:
+        cell.number_format = number_format
+    return cell
+
 def generate_template(output_dir='./'):
     """
     Generate Excel template for bulk occupancy forecasting.
@@ -57,28 +71,38 @@ def generate_template(output_dir='./'):
     
     Returns: Path to generated template file
     """
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Occupancy Template"
+    # Write-only workbook streams each row to disk as it is appended,
+    # so rows must be written top to bottom (row 1, blank row 2, row 3, ...)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Occupancy Template")
+    
+    bold_font = Font(bold=True)
+    
+    # Column widths must be set before the first row is streamed
+    ws.column_dimensions['A'].width = 15
+    for col in range(2, 26):  # Now have 24 columns (12 months x 2)
+        ws.column_dimensions[get_column_letter(col)].width = 10
     
     # ========================================================================
     # SECTION 1: UPLOAD DATE
     # ========================================================================
     
     # Header
-    ws['A1'] = 'OCCUPANCY FORECASTING - INPUT TEMPLATE'
-    ws['A1'].font = Font(bold=True, size=14)
+    ws.append([_styled_cell(ws, 'OCCUPANCY FORECASTING - INPUT TEMPLATE', font=Font(bold=True, size=14))])
+    ws.append([])
     
-    ws['A3'] = 'Upload Date (DD/MM/YY):'
-    ws['B3'] = datetime.now().strftime('%d/%m/%y')
-    ws['B3'].font = Font(italic=True)
+    ws.append([
+        'Upload Date (DD/MM/YY):',
+        _styled_cell(ws, datetime.now().strftime('%d/%m/%y'), font=Font(italic=True))
+    ])
+    ws.append([])
     
     # ========================================================================
     # SECTION 2: OCCUPANCY GRID (Current + Forecast columns)
     # ========================================================================
     
-    ws['A5'] = 'OCCUPANCY DATA (%)'
-    ws['A5'].font = Font(bold=True)
+    ws.append([_styled_cell(ws, 'OCCUPANCY DATA (%)', font=bold_font)])
+    ws.append([])
     
     months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
@@ -96,43 +120,27 @@ def generate_template(output_dir='./'):
     days_in_month = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]  # 2026 is not leap year
     
     # Header row (row 7): Date/Month | Jan | Jan_Forecast | Feb | Feb_Forecast | ...
-    ws['A7'] = 'Date/Month'
-    ws['A7'].font = Font(bold=True)
-    
-    col_idx = 2
+    # Top edge of each grouped month-pair box
+    forecast_header_font = Font(bold=True, color='808080')
+    header_row = [_styled_cell(ws, 'Date/Month', font=bold_font)]
     for month in months:
-        # Current occupancy column
-        ws.cell(row=7, column=col_idx, value=month)
-        ws.cell(row=7, column=col_idx).font = Font(bold=True)
-        
-        # Forecast column (leave empty for template)
-        ws.cell(row=7, column=col_idx+1, value=f'{month}_Forecast')
-        ws.cell(row=7, column=col_idx+1).font = Font(bold=True, color='808080')
-        
-        # Top edge of grouped month-pair box
-        ws.cell(row=7, column=col_idx).border = left_top_border
-        ws.cell(row=7, column=col_idx+1).border = top_right_border
-        
-        col_idx += 2
+        header_row.append(_styled_cell(ws, month, font=bold_font, border=left_top_border))
+        header_row.append(_styled_cell(ws, f'{month}_Forecast', font=forecast_header_font, border=top_right_border))
+    ws.append(header_row)
     
-    # Data rows: 1-31 for each date
+    # Data rows 8-38: current occupancy (user fills) + empty forecast column per month
+    # Left border on current-occ col + right border on forecast col = grouped box
+    # Bottom border at last valid day of each month
     for date_num in range(1, 32):
-        row_num = 7 + date_num
-        ws.cell(row=row_num, column=1, value=date_num)
-        ws.cell(row=row_num, column=1).font = Font(bold=True)
-        
-        col_idx = 2
-        for month_idx, month in enumerate(months):
-            # Current occupancy (user fills)
-            ws.cell(row=row_num, column=col_idx, value=0)
-            
-            # Forecast column (empty for template)
-            ws.cell(row=row_num, column=col_idx+1, value=None)
-            
-            col_idx += 2
+        row = [_styled_cell(ws, date_num, font=bold_font)]
+        for month_idx in range(len(months)):
+            last_day = date_num == days_in_month[month_idx]
+            row.append(_styled_cell(ws, 0, border=left_bottom_border if last_day else left_border))
+            row.append(_styled_cell(ws, None, border=bottom_right_border if last_day else right_border))
+        ws.append(row)
     
     # ========================================================================
-    # CONDITIONAL FORMATTING (applied before borders)
+    # CONDITIONAL FORMATTING
     # ========================================================================
     # <50: no formatting (blocker rule with no style)
     ws.conditional_formatting.add(
@@ -152,40 +160,17 @@ def generate_template(output_dir='./'):
                        end_type='num',   end_value=99,   end_color=Color(rgb=COLORS['red_99'])))
 
     # ========================================================================
-    # BORDERS (applied after conditional formatting)
-    # Left border on current-occ col + right border on forecast col = grouped box
-    # Bottom border at last valid day of each month
-    # ========================================================================
-    for date_num in range(1, 32):
-        row_num = 7 + date_num
-        col_idx = 2
-        for month_idx in range(len(months)):
-            cell_current  = ws.cell(row=row_num, column=col_idx)
-            cell_forecast = ws.cell(row=row_num, column=col_idx + 1)
-            last_day = date_num == days_in_month[month_idx]
-
-            cell_current.border  = left_bottom_border  if last_day else left_border
-            cell_forecast.border = bottom_right_border if last_day else right_border
-
-            col_idx += 2
-    
-    # ========================================================================
-    # INSTRUCTIONS
+    # INSTRUCTIONS (rows 40-46)
     # ========================================================================
     
-    ws['A40'] = 'INSTRUCTIONS:'
-    ws['A40'].font = Font(bold=True)
-    ws['A41'] = '1. Update Upload Date to current date (DD/MM/YY format)'
-    ws['A42'] = '2. Fill ONLY the month columns (not forecast columns)'
-    ws['A43'] = '3. Enter occupancy 0-100% for each date'
-    ws['A44'] = '4. Bottom borders mark last valid day of each month - do not enter data below these'
-    ws['A45'] = '5. Upload to get forecast - forecast columns will be filled automatically'
-    ws['A46'] = '6. Colors: <50 no color | 50 green, 75 yellow, 99 red | 100+ purple'
-    
-    # Adjust column widths
-    ws.column_dimensions['A'].width = 15
-    for col in range(2, 26):  # Now have 24 columns (12 months x 2)
-        ws.column_dimensions[ws.cell(row=1, column=col).column_letter].width = 10
+    ws.append([])
+    ws.append([_styled_cell(ws, 'INSTRUCTIONS:', font=bold_font)])
+    ws.append(['1. Update Upload Date to current date (DD/MM/YY format)'])
+    ws.append(['2. Fill ONLY the month columns (not forecast columns)'])
+    ws.append(['3. Enter occupancy 0-100% for each date'])
+    ws.append(['4. Bottom borders mark last valid day of each month - do not enter data below these'])
+    ws.append(['5. Upload to get forecast - forecast columns will be filled automatically'])
+    ws.append(['6. Colors: <50 no color | 50 green, 75 yellow, 99 red | 100+ purple'])
     
     # Save template
     template_path = os.path.join(output_dir, BULK_CONFIG['template_filename'])
@@ -198,59 +183,68 @@ def generate_template(output_dir='./'):
 # EXCEL PARSER
 # ============================================================================
 
-def parse_uploaded_excel(filepath):
+def parse_uploaded_excel(filepath, source_name=None):
     """
     Parse uploaded Excel file and extract inputs.
     
+    filepath may be a path or a binary file-like object; source_name is the
+    name to log for file-like objects (e.g. the upload's filename).
+    
     Returns: dict with:
         - upload_date: datetime object
         - occupancy_df: DataFrame with columns [stay_date, current_occupancy]
     """
-    print(f"📂 Parsing uploaded file: {filepath}")
-    
-    wb = load_workbook(filepath, data_only=True)
-    ws = wb.active
+    if isinstance(filepath, str):
+        source_name = filepath
+    print(f"📂 Parsing uploaded file: {source_name or 'uploaded file'}")
+    
+    # Read-only mode streams the sheet XML instead of building every cell in memory
+    wb = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        
+        # Extract upload date (B3)
+        upload_date_str = ws['B3'].value
+        
+        # Extract current occupancy grid (rows 8-38, columns with current data only)
+        # New structure: Col 2=Jan, 3=Jan_Forecast, 4=Feb, 5=Feb_Forecast, etc.
+        # We read columns 2, 4, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24 (current only)
+        grid = list(ws.iter_rows(min_row=8, max_row=38, min_col=2, max_col=25, values_only=True))
+    finally:
+        wb.close()
     
-    # Extract upload date (B3)
-    upload_date_str = ws['B3'].value
     if isinstance(upload_date_str, datetime):
         upload_date = upload_date_str
     else:
         upload_date = datetime.strptime(upload_date_str, '%d/%m/%y')
     
-    # Extract current occupancy grid (rows 8-38, columns with current data only)
-    # New structure: Col 2=Jan, 3=Jan_Forecast, 4=Feb, 5=Feb_Forecast, etc.
-    # We read columns 2, 4, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24 (current only)
-    occupancy_data = []
+    # Build numerically so all-empty (None) month columns never go through object dtype.
+    # Read-only iter_rows stops at the sheet's last physical row, so pad back out to
+    # the full 31 days x 24 columns (missing cells count as 0 occupancy)
+    current_grid = (
+        pd.DataFrame(grid, dtype=float)
+        .reindex(index=range(31), columns=range(24))
+        .iloc[:, ::2]
+        .fillna(0)
+        .to_numpy()
+    )
     
     current_year = upload_date.year
-    month_nums = list(range(1, 13))  # 1-12
-    
-    for date_num in range(1, 32):
-        row_idx = 7 + date_num
-        
-        for idx, month_num in enumerate(month_nums):
-            # Read from current columns only (2, 4, 6, ..., 24)
-            col_idx = 2 + (idx * 2)  # Even columns: 2, 4, 6, 8, etc.
-            occupancy_value = ws.cell(row=row_idx, column=col_idx).value
-            
-            if occupancy_value is None:
-                occupancy_value = 0
-            else:
-                occupancy_value = float(occupancy_value)
-            
-            # Create date object
-            try:
-                stay_date = datetime(current_year, month_num, date_num)
-                occupancy_data.append({
-                    'stay_date': stay_date,
-                    'current_occupancy': occupancy_value
-                })
-            except ValueError:
-                # Invalid date (e.g., Feb 31) - skip
-                continue
     
-    occupancy_df = pd.DataFrame(occupancy_data)
+    # Row-major (date 1-31) x (month 1-12), skipping invalid dates (e.g., Feb 31)
+    day_nums = np.repeat(np.arange(1, 32), 12)
+    month_nums = np.tile(np.arange(1, 13), 31)
+    month_lengths = np.array([calendar.monthrange(current_year, m)[1] for m in range(1, 13)])
+    valid = day_nums <= month_lengths[month_nums - 1]
+    
+    occupancy_df = pd.DataFrame({
+        'stay_date': pd.to_datetime({
+            'year': current_year,
+            'month': month_nums[valid],
+            'day': day_nums[valid]
+        }),
+        'current_occupancy': current_grid.ravel()[valid]
+    })
     
     print(f"✅ Parsed successfully:")
     print(f"   Upload date: {upload_date.strftime('%d/%m/%Y')}")
@@ -288,57 +282,47 @@ def bulk_forecast(parsed_inputs, completion_ratios_df=None):
     # Use default values for required parameters
     default_total_rooms = 100
     
-    results = []
+    # Keep only dates worth forecasting: not in the past, inside the
+    # forecast window, and with occupancy data
+    # Window checks use the full upload timestamp (a stay date earlier than it is past),
+    # while days_out for the ratio lookup counts whole calendar days, ignoring any
+    # time of day in B3 (e.g. =NOW())
+    elapsed_days = (occupancy_df['stay_date'] - upload_date).dt.days
+    days_out = (occupancy_df['stay_date'] - pd.Timestamp(upload_date).normalize()).dt.days
+    forecast_mask = (
+        (elapsed_days >= 0)
+        & (elapsed_days <= BULK_CONFIG['max_forecast_days'])
+        & (occupancy_df['current_occupancy'] != 0)
+    )
+    candidates = occupancy_df.loc[forecast_mask, ['stay_date', 'current_occupancy']]
+    
+    # Forecast every candidate date in one vectorized pass (no pricing).
+    # Event level is fixed to 'none' in bulk mode, so day type comes
+    # straight from the stay date: Mon-Thu weekday, Fri-Sun weekend
+    model_input = pd.DataFrame({
+        'days_out': days_out[forecast_mask],
+        'current_occupancy': candidates['current_occupancy'],
+        'day_type': np.where(candidates['stay_date'].dt.weekday <= 3, 'weekday', 'weekend')
+    })
+    forecast_results = forecast_occupancy_batch(
+        model_input,
+        completion_ratios_df,
+        total_rooms_available=default_total_rooms
+    )
     
-    for idx, row in occupancy_df.iterrows():
-        stay_date = row['stay_date']
-        current_occ = row['current_occupancy']
-        
-        # Calculate days out
-        days_out = (stay_date - upload_date).days
-        
-        # Skip past dates
-        if days_out < 0:
-            continue
-        
-        # Skip dates beyond forecast window
-        if days_out > BULK_CONFIG['max_forecast_days']:
-            continue
-        
-        # Skip if zero occupancy (no data to forecast)
-        if current_occ == 0:
-            continue
-        
-        # Build input for this specific date
-        stay_date_str = stay_date.strftime('%d%m%y')
-        upload_date_str = upload_date.strftime('%d%m%y')
-        
-        inputs = {
-            'stay_date': stay_date_str,
-            'today_date': upload_date_str,
-            'current_occupancy': current_occ,
-            'total_rooms_available': default_total_rooms,
-            'event_level': 'none'  # Fixed for bulk mode
-        }
-        
-        try:
-            # Run forecast only (no pricing)
-            forecast_results = forecast_occupancy(inputs, completion_ratios_df)
-            
-            # Combine results (occupancy data only)
-            result = {
-                'stay_date': stay_date,
-                'current_occupancy': current_occ,
-                **forecast_results
-            }
-            
-            results.append(result)
-            
-        except Exception as e:
-            print(f"⚠️  Error processing {stay_date.strftime('%d/%m/%Y')}: {e}")
-            continue
-    
-    results_df = pd.DataFrame(results)
+    skipped = len(model_input) - len(forecast_results)
+    if skipped:
+        print(f"⚠️  Skipped {skipped} dates with no usable completion ratio")
+    
+    # Combine results (occupancy data only)
+    results_df = pd.concat(
+        [candidates.loc[forecast_results.index], forecast_results],
+        axis=1
+    ).reset_index(drop=True)
+    
+    # Percentages and ratios only need float32 precision
+    float_columns = results_df.select_dtypes('float64').columns
+    results_df[float_columns] = results_df[float_columns].astype('float32')
     
     print(f"✅ Bulk forecast complete: {len(results_df)} dates processed")
     
@@ -361,14 +345,19 @@ def generate_output_excel(parsed_inputs, forecast_df, output_dir='./'):
     upload_date = parsed_inputs['upload_date']
     occupancy_df = parsed_inputs['occupancy_df']
     
-    # Create workbook and match template layout exactly
-    wb = Workbook()
-    ws1 = wb.active
-    ws1.title = "Occupancy Forecast"
+    # Create workbook and match template layout exactly. Write-only mode
+    # streams rows in order, so every value and style is prepared up front
+    wb = Workbook(write_only=True)
+    ws1 = wb.create_sheet("Occupancy Forecast")
 
     months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-    days_in_month = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    # Days in each month of the upload year (also marks invalid grid days)
+    days_in_month = [calendar.monthrange(upload_date.year, m)[1] for m in range(1, 13)]
+
+    # Shared fonts, created once and reused for every styled cell
+    bold_font = Font(bold=True)
+    forecast_header_font = Font(bold=True, color='808080')
 
     # Border styles
     thin = Side(style='thin', color='FF000000')
@@ -379,75 +368,71 @@ def generate_output_excel(parsed_inputs, forecast_df, output_dir='./'):
     left_bottom_border = Border(left=thin, bottom=thin)
     bottom_right_border = Border(right=thin, bottom=thin)
 
-    # Header block (same as template)
-    ws1['A1'] = 'OCCUPANCY FORECASTING - RESULTS'
-    ws1['A1'].font = Font(bold=True, size=14)
-
-    ws1['A3'] = 'Upload Date (DD/MM/YY):'
-    ws1['B3'] = upload_date.strftime('%d/%m/%y')
-    ws1['B3'].font = Font(italic=True)
-
-    ws1['A5'] = 'OCCUPANCY DATA (%)'
-    ws1['A5'].font = Font(bold=True)
+    # Adjust column widths (same as template); must be set before rows are written
+    ws1.column_dimensions['A'].width = 15
+    for col in range(2, 26):
+        ws1.column_dimensions[get_column_letter(col)].width = 10
+
+    # Fast lookups for current and forecast values, indexed [month][day]
+    # (missing current values default to 0, missing forecasts to NaN)
+    current_arr = np.zeros((13, 32))
+    current_arr[
+        occupancy_df['stay_date'].dt.month.to_numpy(),
+        occupancy_df['stay_date'].dt.day.to_numpy()
+    ] = occupancy_df['current_occupancy'].to_numpy()
+    current_lookup = current_arr.tolist()
+
+    forecast_arr = np.full((13, 32), np.nan)
+    forecast_arr[
+        forecast_df['stay_date'].dt.month.to_numpy(),
+        forecast_df['stay_date'].dt.day.to_numpy()
+    ] = forecast_df['forecast_occupancy_pct'].to_numpy(dtype=float).round(2)  # undo float32 noise on the 2-dp values
+    forecast_lookup = forecast_arr.tolist()
 
-    ws1['A7'] = 'Date/Month'
-    ws1['A7'].font = Font(bold=True)
+    # Header block (same as template)
+    ws1.append([_styled_cell(ws1, 'OCCUPANCY FORECASTING - RESULTS', font=Font(bold=True, size=14))])
+    ws1.append([])
 
-    # Fast lookups for current and forecast values
-    current_lookup = {}
-    for _, row in occupancy_df.iterrows():
-        current_lookup[(row['stay_date'].month, row['stay_date'].day)] = row['current_occupancy']
+    ws1.append([
+        'Upload Date (DD/MM/YY):',
+        _styled_cell(ws1, upload_date.strftime('%d/%m/%y'), font=Font(italic=True))
+    ])
+    ws1.append([])
 
-    forecast_lookup = {}
-    for _, row in forecast_df.iterrows():
-        forecast_lookup[(row['stay_date'].month, row['stay_date'].day)] = row['forecast_occupancy_pct']
+    ws1.append([_styled_cell(ws1, 'OCCUPANCY DATA (%)', font=bold_font)])
+    ws1.append([])
 
-    # Month headers (row 7)
-    col_idx = 2
+    # Month headers (row 7), with the top outside border for each grouped month pair
+    header_row = [_styled_cell(ws1, 'Date/Month', font=bold_font)]
     for month in months:
-        ws1.cell(row=7, column=col_idx, value=month)
-        ws1.cell(row=7, column=col_idx).font = Font(bold=True)
+        header_row.append(_styled_cell(ws1, month, font=bold_font, border=left_top_border))
+        header_row.append(_styled_cell(ws1, f'{month}_Forecast', font=forecast_header_font, border=top_right_border))
+    ws1.append(header_row)
 
-        ws1.cell(row=7, column=col_idx + 1, value=f'{month}_Forecast')
-        ws1.cell(row=7, column=col_idx + 1).font = Font(bold=True, color='808080')
-
-        # Top outside border for grouped month pair
-        ws1.cell(row=7, column=col_idx).border = left_top_border
-        ws1.cell(row=7, column=col_idx + 1).border = top_right_border
-
-        col_idx += 2
-
-    # Data grid (rows 8-38)
+    # Data grid (rows 8-38): one row per date, interleaving current and
+    # forecast values for each month. Left/right borders group each month
+    # pair, with a bottom border on the last valid day of the month
     for date_num in range(1, 32):
-        row_num = 7 + date_num
-        ws1.cell(row=row_num, column=1, value=date_num)
-        ws1.cell(row=row_num, column=1).font = Font(bold=True)
-
-        col_idx = 2
+        row = [_styled_cell(ws1, date_num, font=bold_font)]
         for month_idx in range(12):
             month_num = month_idx + 1
-            key = (month_num, date_num)
-
-            try:
-                datetime(upload_date.year, month_num, date_num)
-            except ValueError:
-                ws1.cell(row=row_num, column=col_idx, value=None)
-                ws1.cell(row=row_num, column=col_idx + 1, value=None)
-                col_idx += 2
-                continue
+            last_day = date_num == days_in_month[month_idx]
+            current_border = left_bottom_border if last_day else left_border
+            forecast_border = bottom_right_border if last_day else right_border
 
-            current_occ = current_lookup.get(key, 0)
-            forecast_occ = forecast_lookup.get(key, None)
+            if date_num > days_in_month[month_idx]:
+                row.append(_styled_cell(ws1, None, border=current_border))
+                row.append(_styled_cell(ws1, None, border=forecast_border))
+                continue
 
-            ws1.cell(row=row_num, column=col_idx, value=current_occ)
-            forecast_cell = ws1.cell(row=row_num, column=col_idx + 1)
-            if forecast_occ is None:
-                forecast_cell.value = None
+            forecast_occ = forecast_lookup[month_num][date_num]
+            row.append(_styled_cell(ws1, current_lookup[month_num][date_num], border=current_border))
+            if np.isnan(forecast_occ):
+                row.append(_styled_cell(ws1, None, border=forecast_border))
             else:
-                forecast_cell.value = round(float(forecast_occ), 1)
-                forecast_cell.number_format = '0.0'
+                row.append(_styled_cell(ws1, round(forecast_occ, 1), border=forecast_border, number_format='0.0'))
 
-            col_idx += 2
+        ws1.append(row)
 
     # ========================================================================
     # CONDITIONAL FORMATTING (same range and rules as template)
@@ -467,36 +452,15 @@ def generate_output_excel(parsed_inputs, forecast_df, output_dir='./'):
                        mid_type='num', mid_value=75, mid_color=Color(rgb=COLORS['yellow_75']),
                        end_type='num', end_value=99, end_color=Color(rgb=COLORS['red_99'])))
 
-    # ========================================================================
-    # BORDERS: Outside grouping per month pair, plus valid-day bottom borders
-    # ========================================================================
-    for date_num in range(1, 32):
-        row_num = 7 + date_num
-        col_idx = 2
-        for month_idx in range(12):
-            cell_current = ws1.cell(row=row_num, column=col_idx)
-            cell_forecast = ws1.cell(row=row_num, column=col_idx + 1)
-            last_day = date_num == days_in_month[month_idx]
-
-            cell_current.border = left_bottom_border if last_day else left_border
-            cell_forecast.border = bottom_right_border if last_day else right_border
-
-            col_idx += 2
-
-    # Instructions block (same as template)
-    ws1['A40'] = 'INSTRUCTIONS:'
-    ws1['A40'].font = Font(bold=True)
-    ws1['A41'] = '1. Update Upload Date to current date (DD/MM/YY format)'
-    ws1['A42'] = '2. Fill ONLY the month columns (not forecast columns)'
-    ws1['A43'] = '3. Enter occupancy 0-100% for each date'
-    ws1['A44'] = '4. Bottom borders mark last valid day of each month - do not enter data below these'
-    ws1['A45'] = '5. Upload to get forecast - forecast columns will be filled automatically'
-    ws1['A46'] = '6. Colors: <50 no color | 50 green, 75 yellow, 99 red | 100+ purple'
-
-    # Adjust column widths (same as template)
-    ws1.column_dimensions['A'].width = 15
-    for col in range(2, 26):
-        ws1.column_dimensions[ws1.cell(row=1, column=col).column_letter].width = 10
+    # Instructions block (same as template, rows 40-46)
+    ws1.append([])
+    ws1.append([_styled_cell(ws1, 'INSTRUCTIONS:', font=bold_font)])
+    ws1.append(['1. Update Upload Date to current date (DD/MM/YY format)'])
+    ws1.append(['2. Fill ONLY the month columns (not forecast columns)'])
+    ws1.append(['3. Enter occupancy 0-100% for each date'])
+    ws1.append(['4. Bottom borders mark last valid day of each month - do not enter data below these'])
+    ws1.append(['5. Upload to get forecast - forecast columns will be filled automatically'])
+    ws1.append(['6. Colors: <50 no color | 50 green, 75 yellow, 99 red | 100+ purple'])
     
     # ========================================================================
     # SAVE FILE
@@ -516,10 +480,10 @@ def generate_output_excel(parsed_inputs, forecast_df, output_dir='./'):
 # MAIN BULK PROCESSING FUNCTION
 # ============================================================================
 
-def process_bulk_forecast(input_excel_path, output_dir='./', completion_ratios_df=None):
+def process_bulk_forecast(input_excel_path, output_dir='./', completion_ratios_df=None, input_filename=None):
     """
     Complete bulk forecasting workflow:
-    1. Parse input Excel
+    1. Parse input Excel (path or binary file-like object named input_filename)
     2. Run forecasts
     3. Generate output Excel
     
@@ -530,7 +494,7 @@ def process_bulk_forecast(input_excel_path, output_dir='./', completion_ratios_d
     print("="*70)
     
     # Parse input
-    parsed_inputs = parse_uploaded_excel(input_excel_path)
+    parsed_inputs = parse_uploaded_excel(input_excel_path, source_name=input_filename)
     
     # Run forecasts
     forecast_df = bulk_forecast(parsed_inputs, completion_ratios_df=completion_ratios_df)
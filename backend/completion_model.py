@@ -4,6 +4,7 @@ Calculates average completion ratios from historical booking data for occupancy
 """
 
 import pandas as pd
+import numpy as np
 import os
 
 # ============================================================================
@@ -32,10 +33,14 @@ def calculate_individual_ratios(df):
     """
     print("🧮 Calculating individual completion ratios...")
     
-    df['completion_ratio'] = df['rooms_booked_cumulative'] / df['final_occupancy']
+    rooms_booked = df['rooms_booked_cumulative'].to_numpy(dtype=float)
+    final_occupancy = df['final_occupancy'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = rooms_booked / final_occupancy
     
-    # Handle edge cases
-    df['completion_ratio'] = df['completion_ratio'].fillna(0)  # If final_occupancy = 0 (shouldn't happen)
+    # Handle edge cases in the same pass: 0/0 -> 0 (final_occupancy = 0, shouldn't happen);
+    # inf is kept so filter_outliers still drops it
+    df['completion_ratio'] = np.nan_to_num(ratio, copy=False, nan=0.0, posinf=np.inf, neginf=-np.inf)
     
     print(f"✅ Calculated ratios for {len(df):,} records")
     
@@ -60,10 +65,12 @@ def filter_outliers(df, config):
     
     initial_count = len(df)
     
-    df_filtered = df[
-        (df['completion_ratio'] >= config['outlier_min']) & 
-        (df['completion_ratio'] <= config['outlier_max'])
-    ].copy()
+    # Boolean indexing already returns a new frame, no extra copy needed
+    ratio = df['completion_ratio'].to_numpy()
+    df_filtered = df.loc[
+        (ratio >= config['outlier_min']) & 
+        (ratio <= config['outlier_max'])
+    ]
     
     removed_count = initial_count - len(df_filtered)
     
@@ -82,14 +89,41 @@ def aggregate_completion_ratios(df, config):
     """
     print("\n📊 Aggregating completion ratios by day_type and days_out...")
     
+    # The group space is tiny (day_type x days_out), so encode each row's
+    # group as one integer id and aggregate with bincount instead of groupby
+    type_codes, day_types = pd.factorize(df['day_type'], sort=True)
+    days_codes, days_values = pd.factorize(df['days_out'], sort=True)
+    n_days = len(days_values)
+    n_groups = len(day_types) * n_days
+    
+    ratio = df['completion_ratio'].to_numpy(dtype=float)
+    has_ratio = ~np.isnan(ratio)  # NaN ratios are skipped, like pandas count/mean
+    group_id = (type_codes * n_days + days_codes)[has_ratio]
+    ratio = ratio[has_ratio]
+    
     # Group and calculate statistics
-    grouped = df.groupby(['day_type', 'days_out'])['completion_ratio'].agg([
-        ('avg_completion_ratio', 'mean'),
-        ('sample_count', 'count'),
-        ('std_deviation', 'std'),
-        ('min_ratio', 'min'),
-        ('max_ratio', 'max')
-    ]).reset_index()
+    sample_count = np.bincount(group_id, minlength=n_groups)
+    mean = np.bincount(group_id, weights=ratio, minlength=n_groups) / np.maximum(sample_count, 1)
+    squared_dev = np.bincount(group_id, weights=(ratio - mean[group_id]) ** 2, minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = np.where(sample_count > 1, np.sqrt(squared_dev / (sample_count - 1)), np.nan)
+    
+    min_ratio = np.full(n_groups, np.inf)
+    max_ratio = np.full(n_groups, -np.inf)
+    np.minimum.at(min_ratio, group_id, ratio)
+    np.maximum.at(max_ratio, group_id, ratio)
+    
+    # Keep only (day_type, days_out) combinations that actually occur
+    observed = sample_count > 0
+    grouped = pd.DataFrame({
+        'day_type': day_types.repeat(n_days)[observed],
+        'days_out': np.tile(days_values.to_numpy(), len(day_types))[observed],
+        'avg_completion_ratio': mean[observed],
+        'sample_count': sample_count[observed],
+        'std_deviation': std[observed],
+        'min_ratio': min_ratio[observed],
+        'max_ratio': max_ratio[observed]
+    })
     
     # Round for readability
     grouped['avg_completion_ratio'] = grouped['avg_completion_ratio'].round(4)
@@ -113,13 +147,15 @@ def validate_sample_sizes(df, config):
     
     min_samples = config['min_sample_size']
     
-    df['confidence'] = df['sample_count'].apply(
-        lambda x: 'high' if x >= min_samples else 'low'
+    df['confidence'] = pd.Categorical(
+        np.where(df['sample_count'].to_numpy() >= min_samples, 'high', 'low'),
+        categories=['low', 'high']
     )
     
     # Summary
-    high_conf = len(df[df['confidence'] == 'high'])
-    low_conf = len(df[df['confidence'] == 'low'])
+    confidence_counts = df['confidence'].value_counts()
+    high_conf = int(confidence_counts['high'])
+    low_conf = int(confidence_counts['low'])
     
     print(f"   High confidence groups: {high_conf}")
     print(f"   Low confidence groups: {low_conf}")
@@ -238,7 +274,16 @@ def build_completion_model(input_file='../data_generation/generated_data/aggrega
         return None
     
     print(f"\n📂 Loading aggregated data from: {input_file}")
-    df = pd.read_csv(input_file)
+    df = pd.read_csv(
+        input_file,
+        usecols=['stay_date', 'days_out', 'rooms_booked_cumulative', 'day_type', 'final_occupancy'],
+        dtype={
+            'days_out': 'int16',
+            'rooms_booked_cumulative': 'int32',
+            'final_occupancy': 'int32',
+            'day_type': 'category'
+        }
+    )
     print(f"✅ Loaded {len(df):,} aggregated records")
     print(f"   Unique stay dates: {df['stay_date'].nunique()}")
     
@@ -4,13 +4,21 @@ Converts individual booking records into cumulative booking snapshots.
 """
 
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
+from functools import lru_cache
 import os
+import sys
+
+# Sibling scripts import flat; make that work from any working directory
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from csv_export import write_csv_fast
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+@lru_cache(maxsize=8192)
 def parse_date(date_str):
     """Convert date string/int to datetime object. Handles DDMMYYYY format with missing leading zeros."""
     date_str = str(date_str).strip()
@@ -22,6 +30,14 @@ def parse_date(date_str):
     # Parse as DDMMYYYY
     return datetime.strptime(date_str, '%d%m%Y')
 
+def parse_date_series(dates):
+    """Vectorized parse_date for a whole column (Series or Index) of DDMMYYYY strings/ints."""
+    return pd.to_datetime(dates.astype(str).str.strip().str.zfill(8), format='%d%m%Y', cache=True)
+
+def format_stay_dates(stay_dates):
+    """Render integer DDMMYYYY stay dates as zero-padded 8-character strings."""
+    return stay_dates.astype(str).str.zfill(8)
+
 def format_date(date_obj):
     """Convert datetime object to DDMMYYYY string."""
     return date_obj.strftime('%d%m%Y')
@@ -41,6 +57,41 @@ def calculate_days_out(stay_date_str, booking_date_str):
     booking_date = parse_date(booking_date_str)
     return (stay_date - booking_date).days
 
+def cumsum_by_group(keys, values):
+    """Running total of values that restarts whenever keys changes. Expects rows already sorted by key."""
+    keys = np.asarray(keys)
+    values = np.asarray(values)
+    if len(values) == 0:
+        return values.copy()
+    
+    starts = np.r_[0, np.flatnonzero(keys[1:] != keys[:-1]) + 1]
+    cum = np.cumsum(values)
+    
+    # Subtract the total carried in from earlier groups
+    offsets = cum[starts] - values[starts]
+    return cum - np.repeat(offsets, np.diff(np.r_[starts, len(values)]))
+
+def build_cumulative_matrix(stay_codes, days_out, cumulative, n_stay):
+    """
+    Scatter cumulative bookings into a dense (n_stay, 31) grid with columns ordered days_out 30..0.
+    Gaps take the value of the next observed column to the right (0 when none remains).
+    """
+    in_window = (days_out >= 0) & (days_out <= 30)
+    rows = stay_codes[in_window]
+    cols = 30 - days_out[in_window]
+    
+    values = np.zeros((n_stay, 32), dtype=np.int64)  # Extra column holds the 0 fill
+    observed = np.zeros((n_stay, 32), dtype=bool)
+    values[rows, cols] = cumulative[in_window]
+    observed[rows, cols] = True
+    observed[:, 31] = True
+    
+    # Right-to-left scan for the nearest observed column
+    positions = np.where(observed, np.arange(32), 32)
+    nearest = np.minimum.accumulate(positions[:, ::-1], axis=1)[:, ::-1]
+    
+    return np.take_along_axis(values, nearest, axis=1)[:, :31]
+
 # ============================================================================
 # AGGREGATION FUNCTIONS
 # ============================================================================
@@ -57,38 +108,52 @@ def aggregate_bookings(df):
     
     # Calculate days_out for each booking
     print("📅 Calculating days_out...")
-    df['days_out'] = df.apply(
-        lambda row: calculate_days_out(row['stay_date'], row['booking_date']), 
-        axis=1
-    )
+    # Parse each distinct date once, then broadcast back to rows through the category codes.
+    # Categorical stay_date also lets every groupby below work on small integer codes
+    stay_key = df['stay_date'].astype('category')
+    book_key = df['booking_date'].astype('category')
+    stay_dates = parse_date_series(stay_key.cat.categories)
+    book_dates = parse_date_series(book_key.cat.categories)
+    stay = stay_dates.values[stay_key.cat.codes.to_numpy()]
+    book = book_dates.values[book_key.cat.codes.to_numpy()]
+    df['days_out'] = ((stay - book) // np.timedelta64(1, 'D')).astype('int32')
     
     # Count bookings by stay_date and booking_date
     print("🔢 Counting bookings by stay_date and booking_date...")
-    booking_counts = df.groupby(['stay_date', 'booking_date', 'days_out']).size().reset_index(name='new_bookings')
-    
-    # Sort by stay_date and days_out (descending, so 30 days out comes first)
-    booking_counts = booking_counts.sort_values(['stay_date', 'days_out'], ascending=[True, False])
+    # booking_date is implied by (stay_date, days_out); grouping on negated days_out
+    # leaves rows sorted by stay_date and days_out descending, so 30 days out comes first
+    booking_counts = df.groupby(
+        [stay_key, (-df['days_out']).rename('neg_days_out')],
+        observed=True
+    ).size().reset_index(name='new_bookings')
+    booking_counts['days_out'] = -booking_counts.pop('neg_days_out')
     
     # Calculate cumulative bookings for each stay_date
     print("📈 Calculating cumulative bookings...")
-    booking_counts['rooms_booked_cumulative'] = booking_counts.groupby('stay_date')['new_bookings'].cumsum()
+    booking_counts['rooms_booked_cumulative'] = cumsum_by_group(
+        booking_counts['stay_date'].cat.codes.to_numpy(),
+        booking_counts['new_bookings'].to_numpy()
+    )
     
     # Add day_type
     print("🏷️ Adding day type...")
-    booking_counts['day_type'] = booking_counts['stay_date'].apply(get_day_type)
+    stay_weekdays = stay_dates.weekday.to_numpy()[booking_counts['stay_date'].cat.codes.to_numpy()]
+    booking_counts['day_type'] = pd.Categorical(
+        np.where(stay_weekdays <= 3, 'weekday', 'weekend'),  # Mon-Thu / Fri-Sun
+        categories=['weekday', 'weekend']
+    )
     
     # Calculate final occupancy for each stay_date
     print("🎯 Calculating final occupancy...")
-    final_occ = df.groupby('stay_date').size().reset_index(name='final_occupancy')
-    booking_counts = booking_counts.merge(final_occ, on='stay_date', how='left')
+    booking_counts['final_occupancy'] = booking_counts.groupby('stay_date', sort=False, observed=True)['new_bookings'].transform('sum')
+    
+    # Keep stay_date as int32 DDMMYYYY; zero-padding happens only on export/display
+    booking_counts['stay_date'] = booking_counts['stay_date'].astype('int32')
+    booking_counts['rooms_booked_cumulative'] = booking_counts['rooms_booked_cumulative'].astype(int)
     
     # Select and reorder columns
     result = booking_counts[['stay_date', 'days_out', 'rooms_booked_cumulative', 'day_type', 'final_occupancy']]
     
-    # Format data for display and export
-    result['stay_date'] = result['stay_date'].astype(str).str.zfill(8)
-    result['rooms_booked_cumulative'] = result['rooms_booked_cumulative'].astype(int)
-    
     print(f"✅ Aggregation complete!")
     print(f"   Unique stay dates: {result['stay_date'].nunique()}")
     print(f"   Total snapshots: {len(result):,}")
@@ -102,40 +167,28 @@ def fill_missing_days_out(df):
     """
     print("\n🔍 Checking for missing days_out...")
     
-    all_records = []
-    
-    for stay_date in df['stay_date'].unique():
-        stay_data = df[df['stay_date'] == stay_date].copy()
-        day_type = stay_data['day_type'].iloc[0]
-        final_occ = stay_data['final_occupancy'].iloc[0]
-        
-        # Create complete range 30 to 0
-        complete_days = pd.DataFrame({
-            'stay_date': stay_date,
-            'days_out': range(30, -1, -1)
-        })
-        
-        # Merge with actual data
-        merged = complete_days.merge(
-            stay_data[['days_out', 'rooms_booked_cumulative']], 
-            on='days_out', 
-            how='left'
-        )
-        
-        # Forward fill (if days_out=25 is missing, use value from days_out=26)
-        merged['rooms_booked_cumulative'] = merged['rooms_booked_cumulative'].bfill().fillna(0)
-        
-        # Add metadata
-        merged['day_type'] = day_type
-        merged['final_occupancy'] = final_occ
-        
-        all_records.append(merged)
-    
-    result = pd.concat(all_records, ignore_index=True)
-    result = result.sort_values(['stay_date', 'days_out'], ascending=[True, False])
+    # Complete 30..0 grid for every stay_date in one dense pass
+    stay_codes, stay_dates = pd.factorize(df['stay_date'])
+    n_stay = len(stay_dates)
+    grid = build_cumulative_matrix(
+        stay_codes,
+        df['days_out'].to_numpy(),
+        df['rooms_booked_cumulative'].to_numpy(),
+        n_stay
+    )
     
-    # Format data for display and export
-    result['stay_date'] = result['stay_date'].astype(str).str.zfill(8)
+    # Add metadata (constant per stay_date, taken from its first row)
+    _, first_rows = np.unique(stay_codes, return_index=True)
+    first = df.iloc[first_rows]
+    
+    result = pd.DataFrame({
+        'stay_date': np.repeat(np.asarray(stay_dates), 31),
+        'days_out': np.tile(np.arange(30, -1, -1, dtype=np.int64), n_stay),
+        'rooms_booked_cumulative': grid.ravel(),
+        'day_type': first['day_type'].repeat(31).to_numpy(),
+        'final_occupancy': first['final_occupancy'].repeat(31).to_numpy()
+    })
+    result = result.sort_values(['stay_date', 'days_out'], ascending=[True, False])
     result['rooms_booked_cumulative'] = result['rooms_booked_cumulative'].astype(int)
     
     print(f"✅ Missing days filled. Total records: {len(result):,}")
@@ -150,7 +203,7 @@ def save_aggregated_data(df, output_dir='generated_data', filename='aggregated_b
     """Save aggregated DataFrame to CSV."""
     os.makedirs(output_dir, exist_ok=True)
     filepath = os.path.join(output_dir, filename)
-    df.to_csv(filepath, index=False)
+    write_csv_fast(df.assign(stay_date=format_stay_dates(df['stay_date'])), filepath)
     
     print(f"\n💾 Aggregated data saved to: {filepath}")
     print(f"   File size: {os.path.getsize(filepath) / 1024:.2f} KB")
@@ -161,10 +214,12 @@ def display_sample(df, stay_date=None, n=31):
     """Display sample of aggregated data for one stay_date."""
     if stay_date is None:
         stay_date = df['stay_date'].iloc[0]
+    stay_date = int(stay_date)
     
     sample = df[df['stay_date'] == stay_date].head(n)
+    sample = sample.assign(stay_date=format_stay_dates(sample['stay_date']))
     
-    print(f"\n📋 Sample Data for stay_date: {stay_date}")
+    print(f"\n📋 Sample Data for stay_date: {stay_date:08d}")
     print(sample.to_string(index=False))
 
 def display_summary_stats(df):
@@ -172,7 +227,7 @@ def display_summary_stats(df):
     print("\n📊 Aggregated Data Summary:")
     print(f"   Total records: {len(df):,}")
     print(f"   Unique stay dates: {df['stay_date'].nunique()}")
-    print(f"   Date range: {df['stay_date'].min()} to {df['stay_date'].max()}")
+    print(f"   Date range: {df['stay_date'].min():08d} to {df['stay_date'].max():08d}")
     print(f"\n   Day Type Distribution:")
     print(df.groupby('day_type')['stay_date'].nunique())
     print(f"\n   Sample Final Occupancy Stats:")
@@ -192,7 +247,11 @@ def main():
         return
     
     print(f"📂 Loading raw data from: {input_file}")
-    df_raw = pd.read_csv(input_file)
+    df_raw = pd.read_csv(
+        input_file,
+        dtype={'booking_id': np.int32, 'stay_date': np.int32, 'booking_date': np.int32},
+        engine='c'
+    )
     print(f"✅ Loaded {len(df_raw):,} booking records")
     
     # Aggregate
@@ -0,0 +1,27 @@
+"""
+CSV export shared by the data generation scripts.
+"""
+
+def write_csv_fast(df, filepath):
+    """
+    Write DataFrame to CSV with pyarrow's multithreaded writer.
+    
+    Output matches df.to_csv(filepath, index=False); falls back to pandas
+    when pyarrow is not installed, cannot convert a column, or a value
+    would need quoting.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        df.to_csv(filepath, index=False)
+        return
+    
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with open(filepath, 'wb') as f:
+            # Header written separately: pyarrow always quotes header names
+            f.write((','.join(map(str, df.columns)) + '\n').encode('utf-8'))
+            pa_csv.write_csv(table, f, pa_csv.WriteOptions(include_header=False, quoting_style='none'))
+    except pa.ArrowException:
+        df.to_csv(filepath, index=False)
@@ -4,9 +4,15 @@ Generates realistic historical booking transaction data for revenue management f
 """
 
 import pandas as pd
-from datetime import datetime, timedelta
-import random
+import numpy as np
+from datetime import datetime
+import time
 import os
+import sys
+
+# Sibling scripts import flat; make that work from any working directory
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from csv_export import write_csv_fast
 
 # ============================================================================
 # CONFIGURATION
@@ -68,129 +74,155 @@ def get_day_type(date_obj):
     else:  # Fri-Sun
         return 'weekend'
 
-def apply_variation(value, variation_range):
-    """Apply random variation to a value within ±variation_range."""
-    variation = random.uniform(-variation_range, variation_range)
+def apply_variation(value, variation_range, rng):
+    """Apply random variation to a value (or array of values) within ±variation_range."""
+    variation = rng.uniform(-variation_range, variation_range, size=np.shape(value))
     result = value * (1 + variation)
-    return max(0, result)  # Ensure non-negative
+    return np.maximum(0, result)  # Ensure non-negative
 
 # ============================================================================
 # CORE SIMULATION LOGIC
 # ============================================================================
 
-def generate_booking_records_for_stay_date(stay_date, config):
+def build_curve_arrays(config):
+    """
+    Convert the booking curves to arrays once per run.
+    
+    Returns: Dict {day_type: array of 31 baseline percentages},
+    index 0 = 30 days out ... index 30 = arrival day
+    """
+    return {
+        day_type: np.array([config[f'{day_type}_curve'][days_out] for days_out in range(30, -1, -1)])
+        for day_type in ('weekday', 'weekend')
+    }
+
+def generate_booking_records_for_stay_date(stay_date_obj, config, curves, rng, day_type=None):
     """
     Generate all booking records for a single stay date.
     
-    Returns: List of tuples (booking_id_placeholder, stay_date_str, booking_date_str)
+    Args:
+        stay_date_obj: Stay date as a datetime
+        curves: Booking curve arrays from build_curve_arrays(config)
+        rng: numpy.random.Generator
+        day_type: 'weekday'/'weekend' if already known (derived from stay_date_obj otherwise)
+    
+    Returns: datetime64[D] array with one booking_date entry per booking
+    made for this stay date
     Note: booking_id will be assigned globally later
     """
-    stay_date_obj = parse_date(stay_date)
-    day_type = get_day_type(stay_date_obj)
+    if day_type is None:
+        day_type = get_day_type(stay_date_obj)
     
     # Step 1: Determine final occupancy
     occ_range = config['final_occupancy_range'][day_type]
-    final_occupancy = random.randint(occ_range[0], occ_range[1])
+    final_occupancy = int(rng.integers(occ_range[0], occ_range[1], endpoint=True))
     
-    # Step 2: Select booking curve
-    curve = config[f'{day_type}_curve']
+    # Step 2: Select booking curve (index 0 = 30 days out ... index 30 = arrival day)
+    baseline_pct = curves[day_type]
     
-    # Step 3: Generate bookings following the curve
-    bookings = []
-    previous_rooms_booked = 0
+    # Step 3: Generate bookings following the curve, for all days_out at once
     
-    for days_out in range(30, -1, -1):  # 30 down to 0
-        # Get baseline percentage from curve
-        baseline_pct = curve[days_out]
-        
-        # Apply random variation
-        varied_pct = apply_variation(baseline_pct, config['variation'])
-        
-        # Ensure percentage doesn't exceed 100% or go below previous
-        varied_pct = min(varied_pct, 1.0)
-        
-        # Calculate cumulative rooms booked at this point
-        rooms_booked_at_this_point = int(final_occupancy * varied_pct)
-        
-        # Ensure monotonic increase (can't have fewer bookings than before)
-        rooms_booked_at_this_point = max(rooms_booked_at_this_point, previous_rooms_booked)
-        
-        # Ensure we don't exceed final occupancy until days_out = 0
-        if days_out > 0:
-            rooms_booked_at_this_point = min(rooms_booked_at_this_point, final_occupancy - 1)
-        else:  # days_out = 0, arrival day
-            rooms_booked_at_this_point = final_occupancy
-        
-        # Calculate new bookings made on this booking_date
-        new_bookings = rooms_booked_at_this_point - previous_rooms_booked
-        
-        # Calculate booking_date
-        booking_date_obj = stay_date_obj - timedelta(days=days_out)
-        booking_date_str = format_date(booking_date_obj)
-        stay_date_str = format_date(stay_date_obj)
-        
-        # Create booking records
-        for _ in range(new_bookings):
-            bookings.append((None, stay_date_str, booking_date_str))  # booking_id assigned later
-        
-        previous_rooms_booked = rooms_booked_at_this_point
+    # Apply random variation, capped at 100%
+    varied_pct = np.minimum(apply_variation(baseline_pct, config['variation'], rng), 1.0)
+    
+    # Cumulative rooms booked at each point
+    rooms_booked = (final_occupancy * varied_pct).astype(np.int64)
+    
+    # Don't reach final occupancy before arrival day, and keep the curve
+    # monotonic (can't have fewer bookings than before)
+    rooms_booked = np.maximum.accumulate(np.minimum(rooms_booked, final_occupancy - 1))
+    rooms_booked[-1] = final_occupancy  # days_out = 0, arrival day
+    
+    # New bookings made on each booking_date
+    new_bookings = np.diff(rooms_booked, prepend=0)
     
-    return bookings
+    # Booking dates from 30 days out up to the stay date
+    booking_date_days = np.datetime64(stay_date_obj, 'D') - np.arange(30, -1, -1)
+    
+    # One booking_date entry per new booking (booking_id assigned later)
+    return np.repeat(booking_date_days, new_bookings)
 
 def generate_all_stay_dates(config):
-    """Generate list of all stay dates for the simulation period."""
+    """Generate all stay dates for the simulation period (as a DatetimeIndex)."""
     start_date = parse_date(config['start_date'])
     num_days = config['years_of_history'] * 365
     
-    stay_dates = []
-    for i in range(num_days):
-        stay_date = start_date + timedelta(days=i)
-        stay_dates.append(format_date(stay_date))
+    return pd.date_range(start_date, periods=num_days, freq='D')
+
+def generate_booking_chunks(config, seed=None):
+    """
+    Generate booking records one stay date at a time.
+    
+    seed: optional seed for the NumPy random generator (None = fresh randomness)
+    
+    Yields: Tuple (stay_date_obj, booking_date_array) per stay date, in date order
+    """
+    # Generate all stay dates
+    stay_dates = generate_all_stay_dates(config)
+    print(f"📊 Generating data for {len(stay_dates)} stay dates...")
+    
+    # One generator for the whole run: every draw comes from a single seeded stream
+    rng = np.random.default_rng(seed)
+    
+    # Curve arrays are built once and shared by every stay date
+    curves = build_curve_arrays(config)
+    
+    # Classify every stay date at once: Mon-Thu weekday, Fri-Sun weekend
+    day_types = np.where(stay_dates.weekday <= 3, 'weekday', 'weekend').tolist()
+    
+    last_progress_time = time.monotonic()
     
-    return stay_dates
+    for idx, (stay_date_obj, day_type) in enumerate(zip(stay_dates.to_pydatetime(), day_types)):
+        yield stay_date_obj, generate_booking_records_for_stay_date(
+            stay_date_obj, config, curves, rng, day_type=day_type
+        )
+        
+        # Progress indicator (at most once per second)
+        now = time.monotonic()
+        if now - last_progress_time >= 1.0:
+            print(f"   Processed {idx + 1}/{len(stay_dates)} stay dates...")
+            last_progress_time = now
 
-def simulate_historical_data(config):
+def simulate_historical_data(config, seed=None):
     """
     Main simulation function.
     Generates all booking records for all stay dates.
     
+    seed: optional seed for the NumPy random generator (None = fresh randomness)
+    
     Returns: pandas DataFrame with columns [booking_id, stay_date, booking_date]
+    (dates stored as datetime64; formatted as DDMMYYYY only on export/display)
     """
     print("🚀 Starting Hotel Booking Data Simulation...")
     print(f"📅 Period: {config['years_of_history']} years from {config['start_date']}")
     print(f"🏨 Total Rooms: {config['total_rooms']}")
     print()
     
-    # Generate all stay dates
-    stay_dates = generate_all_stay_dates(config)
-    print(f"📊 Generating data for {len(stay_dates)} stay dates...")
+    # Collect booking dates per stay date; stay dates are expanded once at the end
+    stay_date_objs = []
+    booking_date_chunks = []
     
-    # Collect all bookings
-    all_bookings = []
+    for stay_date_obj, booking_dates in generate_booking_chunks(config, seed):
+        stay_date_objs.append(stay_date_obj)
+        booking_date_chunks.append(booking_dates)
     
-    for idx, stay_date in enumerate(stay_dates):
-        bookings = generate_booking_records_for_stay_date(stay_date, config)
-        all_bookings.extend(bookings)
-        
-        # Progress indicator
-        if (idx + 1) % 100 == 0:
-            print(f"   Processed {idx + 1}/{len(stay_dates)} stay dates...")
+    booking_counts = [len(chunk) for chunk in booking_date_chunks]
+    total_bookings = sum(booking_counts)
     
-    print(f"\n✅ Generated {len(all_bookings)} total booking records")
+    print(f"\n✅ Generated {total_bookings} total booking records")
     
-    # Assign sequential booking IDs
+    # Assign sequential booking IDs and create DataFrame
     print("🔢 Assigning booking IDs...")
-    bookings_with_ids = []
-    for idx, (_, stay_date, booking_date) in enumerate(all_bookings, start=1):
-        bookings_with_ids.append((idx, stay_date, booking_date))
-    
-    # Create DataFrame
-    df = pd.DataFrame(bookings_with_ids, columns=['booking_id', 'stay_date', 'booking_date'])
+    df = pd.DataFrame({
+        'booking_id': np.arange(1, total_bookings + 1, dtype=np.int64),
+        'stay_date': np.repeat(np.array(stay_date_objs, dtype='datetime64[D]'), booking_counts),
+        'booking_date': np.concatenate(booking_date_chunks)
+    })
     
     print(f"✅ Simulation complete!")
     print(f"\n📈 Summary Statistics:")
     print(f"   Total bookings: {len(df):,}")
-    print(f"   Date range: {df['stay_date'].min()} to {df['stay_date'].max()}")
+    print(f"   Date range: {format_date(df['stay_date'].min())} to {format_date(df['stay_date'].max())}")
     print(f"   Unique stay dates: {df['stay_date'].nunique()}")
     
     return df
@@ -199,34 +231,66 @@ def simulate_historical_data(config):
 # SAVE & EXPORT
 # ============================================================================
 
+def format_date_columns(df):
+    """Return a copy of df with datetime columns formatted as DDMMYYYY strings."""
+    date_columns = df.select_dtypes('datetime').columns
+    return df.assign(**{col: df[col].dt.strftime('%d%m%Y') for col in date_columns})
+
 def save_to_csv(df, output_dir='generated_data', filename='historical_bookings.csv'):
     """Save DataFrame to CSV file."""
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
     filepath = os.path.join(output_dir, filename)
-    df.to_csv(filepath, index=False)
+    write_csv_fast(format_date_columns(df), filepath)
     
     print(f"\n💾 Data saved to: {filepath}")
     print(f"   File size: {os.path.getsize(filepath) / 1024:.2f} KB")
     
     return filepath
 
+def simulate_to_csv(config, output_dir='generated_data', filename='historical_bookings.csv', seed=None):
+    """
+    Stream the simulation straight to CSV, one stay date at a time.
+    
+    Produces the same file as simulate_historical_data + save_to_csv for the
+    same seed, but only one stay date's bookings are held in memory, so
+    long simulations (many years_of_history) don't need the full DataFrame.
+    
+    Returns: Path to the CSV file
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    filepath = os.path.join(output_dir, filename)
+    
+    booking_id = 0
+    with open(filepath, 'w', newline='') as f:
+        f.write('booking_id,stay_date,booking_date\n')
+        for stay_date_obj, booking_dates in generate_booking_chunks(config, seed):
+            stay_date_str = format_date(stay_date_obj)
+            booking_date_strs = pd.DatetimeIndex(booking_dates).strftime('%d%m%Y')
+            f.writelines(
+                f'{booking_id + i},{stay_date_str},{booking_date}\n'
+                for i, booking_date in enumerate(booking_date_strs, start=1)
+            )
+            booking_id += len(booking_dates)
+    
+    print(f"\n💾 Streamed {booking_id:,} bookings to: {filepath}")
+    print(f"   File size: {os.path.getsize(filepath) / 1024:.2f} KB")
+    
+    return filepath
+
 def display_sample(df, n=20):
     """Display sample of generated data."""
     print(f"\n📋 Sample Data (first {n} rows):")
-    print(df.head(n).to_string(index=False))
+    print(format_date_columns(df.head(n)).to_string(index=False))
 
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
 
 if __name__ == "__main__":
-    # Set random seed for reproducibility (optional - comment out for true randomness)
-    random.seed(42)
-    
-    # Run simulation
-    df = simulate_historical_data(CONFIG)
+    # Run simulation with a fixed seed for reproducibility (use seed=None for true randomness)
+    df = simulate_historical_data(CONFIG, seed=42)
     
     # Display sample
     display_sample(df, n=20)
@@ -6,8 +6,10 @@ Combines:
 2. Pricing: Recommends ADR adjustments to achieve target occupancy
 """
 
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from functools import lru_cache
 import os
 
 # ============================================================================
@@ -47,11 +49,14 @@ CONFIG = {
 # INPUT VALIDATION & HELPERS
 # ============================================================================
 
+@lru_cache(maxsize=8192)
 def parse_date(date_str):
     """
     Convert DDMMYY string to datetime object.
     
     Input format: 'DDMMYY' (e.g., '150226' for 15 Feb 2026)
+    Results are cached: the same stay/today strings are parsed several
+    times per forecast (day type, days out, monthly target).
     """
     try:
         return datetime.strptime(date_str, '%d%m%y')
@@ -65,7 +70,10 @@ def get_day_type(date_str):
     Input: date_str in DDMMYY format
     Output: 'weekday' or 'weekend'
     """
-    date_obj = parse_date(date_str)
+    return _day_type_of(parse_date(date_str))
+
+def _day_type_of(date_obj):
+    """Day type for an already-parsed date."""
     weekday = date_obj.weekday()  # 0=Monday, 6=Sunday
     return 'weekday' if weekday <= 3 else 'weekend'
 
@@ -76,8 +84,10 @@ def calculate_days_out(stay_date_str, today_date_str):
     Input: Both dates in DDMMYY format
     Output: integer (days)
     """
-    stay_date = parse_date(stay_date_str)
-    today_date = parse_date(today_date_str)
+    return _days_out_between(parse_date(stay_date_str), parse_date(today_date_str), stay_date_str)
+
+def _days_out_between(stay_date, today_date, stay_date_str):
+    """Days out for already-parsed dates (stay_date_str is only used in errors)."""
     days = (stay_date - today_date).days
     
     if days < 0:
@@ -142,11 +152,21 @@ def validate_inputs(inputs):
 # COMPLETION RATIO LOOKUP
 # ============================================================================
 
+# Default completion ratios file, relative to this file's location
+COMPLETION_RATIOS_PATH = os.path.join(os.path.dirname(__file__), 'data', 'completion_ratios.csv')
+
+# Loaded ratio tables keyed by absolute path -> (file mtime, DataFrame)
+_completion_ratios_cache = {}
+
 def load_completion_ratios(filepath=None):
-    """Load pre-calculated completion ratios."""
+    """
+    Load pre-calculated completion ratios.
+    
+    The parsed table is memoized per file and re-read only when the file's
+    mtime changes. Callers share the cached DataFrame and must not mutate it.
+    """
     if filepath is None:
-        # Use path relative to this file's location
-        filepath = os.path.join(os.path.dirname(__file__), 'data', 'completion_ratios.csv')
+        filepath = COMPLETION_RATIOS_PATH
     
     if not os.path.exists(filepath):
         raise FileNotFoundError(
@@ -154,58 +174,99 @@ def load_completion_ratios(filepath=None):
             "Please run completion_model.py first to generate this file."
         )
     
-    return pd.read_csv(filepath)
+    cache_key = os.path.abspath(filepath)
+    mtime = os.path.getmtime(filepath)
+    cached = _completion_ratios_cache.get(cache_key)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, pd.read_csv(filepath))
+        _completion_ratios_cache[cache_key] = cached
+    
+    return cached[1]
+
+# Integer day type codes used as lookup keys
+_DAY_TYPE_CODES = {'weekday': 0, 'weekend': 1}
+
+# Forecast inputs may also be 'event', which uses weekend completion ratios
+_LOOKUP_DAY_TYPE_CODES = {**_DAY_TYPE_CODES, 'event': _DAY_TYPE_CODES['weekend']}
+
+def build_ratio_table(completion_ratios_df):
+    """
+    Index completion ratios by (day_type code, days_out) for O(1) lookups.
+    
+    Build once per loaded completion_ratios_df and reuse it across forecasts.
+    
+    Args:
+        completion_ratios_df: DataFrame with completion ratios
+    
+    Returns:
+        dict mapping (day_type code, days_out) -> dict with 'ratio', 'confidence', 'sample_count'
+    """
+    # First row wins for duplicate keys, same as the previous .iloc[0] lookup
+    ratios = completion_ratios_df.drop_duplicates(['day_type', 'days_out'])
+    
+    return {
+        (_DAY_TYPE_CODES[day_type], days_out): {
+            'ratio': ratio,
+            'confidence': confidence,
+            'sample_count': int(sample_count)
+        }
+        for day_type, days_out, ratio, confidence, sample_count in zip(
+            ratios['day_type'].tolist(),
+            ratios['days_out'].tolist(),
+            ratios['avg_completion_ratio'].to_numpy(),  # np.float64 keeps numpy rounding downstream
+            ratios['confidence'].tolist(),
+            ratios['sample_count'].tolist()
+        )
+        if day_type in _DAY_TYPE_CODES
+    }
 
-def get_completion_ratio(day_type, days_out, completion_ratios_df):
+def get_completion_ratio(day_type, days_out, ratio_table):
     """
     Retrieve completion ratio for given day_type and days_out.
     
     Args:
         day_type: 'weekday', 'weekend', or 'event'
         days_out: 0-30
-        completion_ratios_df: DataFrame with completion ratios
+        ratio_table: dict from build_ratio_table()
     
     Returns:
         dict with 'ratio', 'confidence', 'sample_count'
     """
-    # For events, use weekend completion ratios
-    lookup_day_type = 'weekend' if day_type == 'event' else day_type
-    
-    result = completion_ratios_df[
-        (completion_ratios_df['day_type'] == lookup_day_type) & 
-        (completion_ratios_df['days_out'] == days_out)
-    ]
+    # For events, use weekend completion ratios (shared day type code)
+    ratio_info = ratio_table.get((_LOOKUP_DAY_TYPE_CODES.get(day_type), days_out))
     
-    if len(result) == 0:
+    if ratio_info is None:
+        lookup_day_type = 'weekend' if day_type == 'event' else day_type
         raise ValueError(
             f"No completion ratio found for day_type={lookup_day_type}, days_out={days_out}"
         )
     
-    row = result.iloc[0]
-    
-    return {
-        'ratio': row['avg_completion_ratio'],
-        'confidence': row['confidence'],
-        'sample_count': int(row['sample_count'])
-    }
+    return dict(ratio_info)
 
 # ============================================================================
 # FORECASTING ENGINE
 # ============================================================================
 
-def forecast_occupancy(inputs, completion_ratios_df, config=CONFIG):
+def forecast_occupancy(inputs, completion_ratios_df, config=CONFIG, ratio_table=None):
     """
     Forecast final occupancy based on current booking pace.
     
     Formula: forecast_occupancy = current_occupancy / completion_ratio
     
+    Pass a prebuilt ratio_table (see build_ratio_table) to skip rebuilding
+    the lookup from completion_ratios_df on every call.
+    
     Returns: dict with forecast results
     """
+    # Parse dates once for days out and day type
+    stay_date = parse_date(inputs['stay_date'])
+    today_date = parse_date(inputs['today_date'])
+    
     # Calculate days out
-    days_out = calculate_days_out(inputs['stay_date'], inputs['today_date'])
+    days_out = _days_out_between(stay_date, today_date, inputs['stay_date'])
     
     # Determine day type
-    base_day_type = get_day_type(inputs['stay_date'])
+    base_day_type = _day_type_of(stay_date)
     
     # If event flagged, override day_type for display purposes
     if inputs['event_level'] != 'none':
@@ -224,7 +285,9 @@ def forecast_occupancy(inputs, completion_ratios_df, config=CONFIG):
         )
     
     # Get completion ratio (uses weekend ratio for events)
-    ratio_info = get_completion_ratio(day_type, days_out, completion_ratios_df)
+    if ratio_table is None:
+        ratio_table = build_ratio_table(completion_ratios_df)
+    ratio_info = get_completion_ratio(day_type, days_out, ratio_table)
     completion_ratio = ratio_info['ratio']
     
     # Calculate forecast
@@ -250,6 +313,66 @@ def forecast_occupancy(inputs, completion_ratios_df, config=CONFIG):
         'forecast_capped': forecast_capped
     }
 
+def forecast_occupancy_batch(df, completion_ratios_df, total_rooms_available=100, config=CONFIG):
+    """
+    Vectorized forecast_occupancy for many rows at once.
+
+    Args:
+        df: DataFrame with [days_out, current_occupancy, day_type]
+            (day_type is 'weekday', 'weekend', or 'event')
+        completion_ratios_df: DataFrame with completion ratios
+        total_rooms_available: Integer (or Series aligned with df) used for
+            forecast_occupancy_rooms
+
+    Returns:
+        DataFrame with the same columns as the forecast_occupancy dict.
+        Rows that forecast_occupancy would reject (zero occupancy too far out,
+        missing/zero completion ratio) are dropped; the index of df is kept.
+    """
+    day_type = df['day_type'].astype(str)
+    days_out = df['days_out'].astype('int64')
+    current_occ = pd.to_numeric(df['current_occupancy'], errors='coerce')
+
+    # Join on integer day type codes (events share the weekend code);
+    # unknown day types get codes that never match each other
+    keys = pd.DataFrame({
+        'day_type_code': day_type.map(_LOOKUP_DAY_TYPE_CODES).fillna(-1).astype('int8').to_numpy(),
+        'days_out': days_out.to_numpy()
+    })
+    ratios = completion_ratios_df.drop_duplicates(['day_type', 'days_out']).assign(
+        day_type_code=lambda r: r['day_type'].map(_DAY_TYPE_CODES).fillna(-2).astype('int8')
+    )
+    matched = keys.merge(
+        ratios[['day_type_code', 'days_out', 'avg_completion_ratio', 'confidence', 'sample_count']],
+        on=['day_type_code', 'days_out'],
+        how='left'
+    )
+    matched.index = df.index
+    completion_ratio = matched['avg_completion_ratio']
+
+    valid = (
+        completion_ratio.notna() &
+        (completion_ratio != 0) &
+        current_occ.notna() &
+        ~((current_occ == 0) & (days_out >= config['zero_occ_days_threshold']))
+    )
+
+    completion_ratio = completion_ratio[valid]
+    forecast_occ_pct = current_occ[valid] / completion_ratio
+    if isinstance(total_rooms_available, pd.Series):
+        total_rooms_available = total_rooms_available[valid]
+
+    return pd.DataFrame({
+        'days_out': days_out[valid],
+        'day_type': day_type[valid],
+        'completion_ratio': completion_ratio,
+        'forecast_occupancy_pct': forecast_occ_pct.round(2),
+        'forecast_occupancy_rooms': np.rint(forecast_occ_pct * total_rooms_available / 100).astype(int),
+        'confidence_level': matched['confidence'][valid],
+        'sample_count': matched['sample_count'][valid].astype(int),
+        'forecast_capped': forecast_occ_pct > 100
+    })
+
 # ============================================================================
 # PRICING RECOMMENDATION ENGINE
 # ============================================================================
@@ -265,12 +388,13 @@ def get_monthly_target(stay_date_str, monthly_targets):
     Returns:
         Target value for that month
     """
-    date_obj = parse_date(stay_date_str)
+    return monthly_targets[_month_key(parse_date(stay_date_str))]
+
+def _month_key(date_obj):
+    """Monthly target key ('jan'...'dec') for an already-parsed date."""
     month_names = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 
                    'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
-    month_key = month_names[date_obj.month - 1]
-    
-    return monthly_targets[month_key]
+    return month_names[date_obj.month - 1]
 
 def calculate_price_adjustment(inputs, forecast_results, config=CONFIG):
     """
@@ -289,12 +413,20 @@ def calculate_price_adjustment(inputs, forecast_results, config=CONFIG):
     
     Returns: dict with pricing recommendations
     """
+    event_level = inputs['event_level']
+    is_event = event_level != 'none'
+    event_premium = config['event_premiums'][event_level]
+    
+    # Month of the stay date, resolved once for the monthly lookups below
+    if 'monthly_targets' in inputs or 'monthly_adr_budgets' in inputs:
+        month_key = _month_key(parse_date(inputs['stay_date']))
+    
     # Calculate occupancy gap
     forecast_occ = forecast_results['forecast_occupancy_pct']
     
     # Get target occupancy (support both single value and monthly lookup)
     if 'monthly_targets' in inputs:
-        target_occ = get_monthly_target(inputs['stay_date'], inputs['monthly_targets'])
+        target_occ = inputs['monthly_targets'][month_key]
     else:
         target_occ = inputs['target_occupancy']
     
@@ -313,12 +445,9 @@ def calculate_price_adjustment(inputs, forecast_results, config=CONFIG):
     k = inputs['sensitivity_factor']
     base_adjustment = k * occupancy_gap
     
-    # Add event premium if applicable
-    event_premium = config['event_premiums'][inputs['event_level']]
-    
     # For events, add premium only if demand is high/on-target
     # If demand is low even for an event, we might still need to decrease price
-    if inputs['event_level'] != 'none' and occupancy_gap >= 0:
+    if is_event and occupancy_gap >= 0:
         price_adjustment_pct = base_adjustment + event_premium
     else:
         price_adjustment_pct = base_adjustment
@@ -327,8 +456,8 @@ def calculate_price_adjustment(inputs, forecast_results, config=CONFIG):
     base_price_cap = config['default_price_cap']
     
     # For events, increase the allowable cap
-    if inputs['event_level'] != 'none':
-        price_cap = base_price_cap + config['event_premiums'][inputs['event_level']]
+    if is_event:
+        price_cap = base_price_cap + event_premium
     else:
         price_cap = base_price_cap
     
@@ -343,7 +472,7 @@ def calculate_price_adjustment(inputs, forecast_results, config=CONFIG):
     
     # Calculate recommended ADR (support both single value and monthly lookup)
     if 'monthly_adr_budgets' in inputs:
-        current_adr = get_monthly_target(inputs['stay_date'], inputs['monthly_adr_budgets'])
+        current_adr = inputs['monthly_adr_budgets'][month_key]
     else:
         current_adr = inputs['current_adr']
     
@@ -371,7 +500,7 @@ def calculate_price_adjustment(inputs, forecast_results, config=CONFIG):
         'price_change_amount': round(price_change_amount, 2),
         'adjustment_capped': adjustment_capped,
         'price_cap_used': price_cap,
-        'event_premium_applied': event_premium if inputs['event_level'] != 'none' else 0,
+        'event_premium_applied': event_premium if is_event else 0,
         'recommendation_text': recommendation_text
     }
 
@@ -425,7 +554,7 @@ def generate_warnings(inputs, forecast_results, pricing_results, config=CONFIG):
 # MAIN FORECASTING & PRICING FUNCTION
 # ============================================================================
 
-def forecast_and_price(inputs, completion_ratios_df=None):
+def forecast_and_price(inputs, completion_ratios_df=None, ratio_table=None):
     """
     Main function: Forecast occupancy and recommend pricing.
     
@@ -442,6 +571,8 @@ def forecast_and_price(inputs, completion_ratios_df=None):
     }
     
     Output format (dict): Combined forecast and pricing results with warnings
+    
+    ratio_table: optional prebuilt lookup from build_ratio_table(completion_ratios_df)
     """
     # Validate inputs
     validate_inputs(inputs)
@@ -451,7 +582,7 @@ def forecast_and_price(inputs, completion_ratios_df=None):
         completion_ratios_df = load_completion_ratios()
     
     # Run forecast
-    forecast_results = forecast_occupancy(inputs, completion_ratios_df)
+    forecast_results = forecast_occupancy(inputs, completion_ratios_df, ratio_table=ratio_table)
     
     # Calculate pricing
     pricing_results = calculate_price_adjustment(inputs, forecast_results)
@@ -7,21 +7,28 @@ FastAPI endpoints for:
 3. Template generation
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
-from fastapi.responses import FileResponse, JSONResponse, Response
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, BackgroundTasks, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, List, Any
 from contextlib import asynccontextmanager
+from functools import lru_cache
 import os
 import sys
+import asyncio
+import shutil
 from datetime import datetime, timedelta
 import tempfile
 from pathlib import Path
 import json
 
+import orjson
 from dotenv import load_dotenv
 from pymongo import MongoClient
 from bson import ObjectId
+from bson.errors import InvalidDocument
+from gridfs import GridFS
+from gridfs.errors import NoFile
 
 # Add backend to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
@@ -29,6 +36,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 from forecaster import (
     forecast_and_price,
     load_completion_ratios,
+    build_ratio_table,
     get_input_options
 )
 from bulk_processor import (
@@ -46,12 +54,15 @@ from backtester import (
 # LIFESPAN MANAGEMENT
 # ============================================================================
 
-# Global completion ratios
+# Global completion ratios (plus a prebuilt lookup for single forecasts)
 completion_ratios_df = None
+completion_ratio_table = None
 mongo_client = None
 mongo_db = None
 mongo_connected = False
 MAX_BULK_HISTORY_RECORDS = 5
+BULK_HISTORY_CLEANUP_INTERVAL_SECONDS = 600
+BULK_OUTPUT_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
 
 def _get_mongodb_uri() -> Optional[str]:
@@ -93,30 +104,96 @@ def _persist_single_forecast(input_payload: dict, output_payload: dict, note: Op
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow(),
         "source": "api_forecast",
-        "input": _to_mongo_compatible(input_payload),
-        "output": _to_mongo_compatible(output_payload),
+        "input": input_payload,
+        "output": output_payload,
         "note": (note or "").strip(),
     }
-    mongo_db["single_day_forecasts"].insert_one(document)
+    try:
+        # Payloads are normally plain Python types already, so try them as-is
+        mongo_db["single_day_forecasts"].insert_one(document)
+    except InvalidDocument:
+        document["input"] = _to_mongo_compatible(input_payload)
+        document["output"] = _to_mongo_compatible(output_payload)
+        mongo_db["single_day_forecasts"].insert_one(document)
+
+
+def _bulk_output_fs() -> GridFS:
+    """GridFS bucket holding bulk forecast output files."""
+    return GridFS(mongo_db, collection="bulk_outputs")
 
 
-def _persist_bulk_run(filename: str, output_filename: str, output_bytes: bytes) -> None:
-    """Persist bulk forecast processing metadata to MongoDB."""
+def _persist_bulk_run(filename: str, output_path: str) -> None:
+    """Persist bulk forecast processing metadata to MongoDB (file contents streamed into GridFS)."""
     if not mongo_db:
         return
 
+    output_filename = os.path.basename(output_path)
+    with open(output_path, "rb") as output_file:
+        file_id = _bulk_output_fs().put(
+            output_file,
+            filename=output_filename,
+            content_type=BULK_OUTPUT_CONTENT_TYPE,
+        )
     document = {
         "created_at": datetime.utcnow(),
         "source": "api_bulk_upload",
         "input_filename": filename,
         "output_filename": output_filename,
-        "output_file_bytes": output_bytes,
-        "content_type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        "size_bytes": len(output_bytes),
+        "file_id": file_id,
+        "content_type": BULK_OUTPUT_CONTENT_TYPE,
+        "size_bytes": os.path.getsize(output_path),
     }
     mongo_db["bulk_forecasts"].insert_one(document)
 
 
+def _delete_bulk_records(records: List[dict]) -> int:
+    """Delete bulk history records and their GridFS files; returns deleted record count."""
+    fs = _bulk_output_fs()
+    for record in records:
+        if record.get("file_id") is not None:
+            fs.delete(record["file_id"])
+
+    ids_to_remove = [record["_id"] for record in records]
+    return mongo_db["bulk_forecasts"].delete_many({"_id": {"$in": ids_to_remove}}).deleted_count
+
+
+def _record_single_forecast(input_payload: dict, output_payload: dict, note: Optional[str] = None) -> None:
+    """Background task: persist a single forecast, logging rather than raising on failure."""
+    try:
+        _persist_single_forecast(input_payload, output_payload, note=note)
+    except Exception as db_error:
+        print(f"⚠️  Warning: Could not persist single forecast: {db_error}")
+
+
+def _record_bulk_run(filename: str, output_path: str) -> None:
+    """Background task: persist a bulk run, then remove its per-request output directory."""
+    try:
+        _persist_bulk_run(filename, output_path)
+    except Exception as db_error:
+        print(f"⚠️  Warning: Could not persist bulk forecast metadata: {db_error}")
+    finally:
+        shutil.rmtree(os.path.dirname(output_path), ignore_errors=True)
+
+
+def _orjson_response(content: Any) -> Response:
+    """JSON response encoded with orjson (datetimes serialized natively as ISO 8601)."""
+    return Response(content=orjson.dumps(content, default=str), media_type="application/json")
+
+
+def _parse_object_id(record_id: str) -> ObjectId:
+    """Convert a path record id to ObjectId, rejecting malformed ids with a 400."""
+    if not ObjectId.is_valid(record_id):
+        raise HTTPException(status_code=400, detail="Invalid record id")
+    return ObjectId(record_id)
+
+
+def _iter_chunks(data: bytes, chunk_size: int = 1 << 20):
+    """Yield zero-copy fixed-size slices of a bytes-like object."""
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size]
+
+
 def _enforce_bulk_history_retention(max_records: int = MAX_BULK_HISTORY_RECORDS) -> None:
     """Keep only the most recent bulk history records in MongoDB."""
     if not mongo_db:
@@ -124,7 +201,7 @@ def _enforce_bulk_history_retention(max_records: int = MAX_BULK_HISTORY_RECORDS)
 
     records_to_remove = list(
         mongo_db["bulk_forecasts"]
-        .find({}, {"_id": 1})
+        .find({}, {"_id": 1, "file_id": 1})
         .sort("created_at", -1)
         .skip(max_records)
     )
@@ -132,19 +209,28 @@ def _enforce_bulk_history_retention(max_records: int = MAX_BULK_HISTORY_RECORDS)
     if not records_to_remove:
         return
 
-    ids_to_remove = [record["_id"] for record in records_to_remove]
-    mongo_db["bulk_forecasts"].delete_many({"_id": {"$in": ids_to_remove}})
+    _delete_bulk_records(records_to_remove)
+
+async def _bulk_history_cleanup_loop(interval_seconds: int = BULK_HISTORY_CLEANUP_INTERVAL_SECONDS) -> None:
+    """Periodically trim bulk history so uploads don't pay for retention queries."""
+    while True:
+        try:
+            await asyncio.to_thread(_enforce_bulk_history_retention)
+        except Exception as db_error:
+            print(f"⚠️  Warning: Could not trim bulk history: {db_error}")
+        await asyncio.sleep(interval_seconds)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Load completion ratios on startup, cleanup on shutdown"""
-    global completion_ratios_df, mongo_client, mongo_db, mongo_connected
+    global completion_ratios_df, completion_ratio_table, mongo_client, mongo_db, mongo_connected
 
     env_path = Path(__file__).resolve().parents[1] / ".env"
     load_dotenv(dotenv_path=env_path)
 
     try:
         completion_ratios_df = load_completion_ratios()
+        completion_ratio_table = build_ratio_table(completion_ratios_df)
         print("✅ Completion ratios loaded successfully")
     except Exception as e:
         print(f"⚠️  Warning: Could not load completion ratios: {e}")
@@ -155,6 +241,9 @@ async def lifespan(app: FastAPI):
             mongo_client = MongoClient(mongodb_uri, serverSelectionTimeoutMS=5000)
             mongo_client.admin.command("ping")
             mongo_db = mongo_client["room_price_forecaster"]
+            # History listing, retention and cleanup all sort/filter on created_at
+            mongo_db["single_day_forecasts"].create_index([("created_at", -1)])
+            mongo_db["bulk_forecasts"].create_index([("created_at", -1)])
             mongo_connected = True
             print("✅ MongoDB connected successfully")
         else:
@@ -165,10 +254,14 @@ async def lifespan(app: FastAPI):
         mongo_client = None
         mongo_db = None
         print(f"⚠️  Warning: MongoDB connection failed: {e}")
+
+    cleanup_task = asyncio.create_task(_bulk_history_cleanup_loop()) if mongo_connected else None
     
     yield
     
     # Cleanup (if needed)
+    if cleanup_task:
+        cleanup_task.cancel()
     if mongo_client:
         mongo_client.close()
     print("🔄 Shutting down...")
@@ -292,21 +385,23 @@ async def root():
     )
 
 
+@lru_cache(maxsize=1)
+def _options_payload() -> bytes:
+    """Serialized /options response; the options are static for the process lifetime."""
+    return orjson.dumps({
+        "status": "success",
+        "data": get_input_options()
+    })
+
+
 @app.get("/options")
 async def get_options():
     """Get available input options (event levels, sensitivity factors)"""
-    try:
-        options = get_input_options()
-        return JSONResponse(content={
-            "status": "success",
-            "data": options
-        })
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return Response(content=_options_payload(), media_type="application/json")
 
 
 @app.post("/forecast", response_model=ForecastOutput)
-async def single_day_forecast(input_data: SingleDayInput):
+async def single_day_forecast(input_data: SingleDayInput, background_tasks: BackgroundTasks):
     """
     Single-day occupancy forecast and pricing recommendation
     
@@ -321,11 +416,10 @@ async def single_day_forecast(input_data: SingleDayInput):
         note_text = (inputs.pop("note", "") or "").strip()
         
         # Run forecast
-        result = forecast_and_price(inputs, completion_ratios_df)
-        try:
-            _persist_single_forecast(inputs, result, note=note_text)
-        except Exception as db_error:
-            print(f"⚠️  Warning: Could not persist single forecast: {db_error}")
+        result = forecast_and_price(inputs, completion_ratios_df, completion_ratio_table)
+        
+        # Persist after the response is sent so Mongo latency never delays it
+        background_tasks.add_task(_record_single_forecast, inputs, result, note=note_text)
         
         return ForecastOutput(**result)
         
@@ -335,8 +429,22 @@ async def single_day_forecast(input_data: SingleDayInput):
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 
+@lru_cache(maxsize=1)
+def _template_bytes(day_key: str) -> bytes:
+    """Generate the bulk template once and keep its bytes; day_key invalidates it daily."""
+    template_path = generate_template(output_dir=tempfile.gettempdir())
+    
+    if not os.path.exists(template_path):
+        raise HTTPException(status_code=500, detail="Template generation failed")
+    
+    with open(template_path, "rb") as f:
+        template_bytes = f.read()
+    os.remove(template_path)
+    return template_bytes
+
+
 @app.get("/bulk/template")
-async def download_template():
+async def download_template(request: Request):
     """
     Download Excel template for bulk forecasting
     
@@ -346,25 +454,34 @@ async def download_template():
     - Current occupancy grid (31 days x 12 months)
     """
     try:
-        # Generate template in temp directory
-        temp_dir = tempfile.gettempdir()
-        template_path = generate_template(output_dir=temp_dir)
+        # Template only changes with the prefilled upload date, so build it once per day
+        day_key = datetime.now().strftime('%Y%m%d')
         
-        if not os.path.exists(template_path):
-            raise HTTPException(status_code=500, detail="Template generation failed")
+        # Clients must revalidate; the ETag changes when the upload date rolls over
+        cache_headers = {
+            "Cache-Control": "no-cache",
+            "ETag": f'"{day_key}"',
+        }
+        if request.headers.get("if-none-match") == cache_headers["ETag"]:
+            return Response(status_code=304, headers=cache_headers)
         
-        return FileResponse(
-            path=template_path,
-            filename="occupancy_template.xlsx",
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        return Response(
+            content=_template_bytes(day_key),
+            media_type=BULK_OUTPUT_CONTENT_TYPE,
+            headers={
+                "Content-Disposition": "attachment; filename=occupancy_template.xlsx",
+                **cache_headers,
+            }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating template: {str(e)}")
 
 
 @app.post("/bulk/upload")
-async def bulk_forecast_upload(file: UploadFile = File(...)):
+async def bulk_forecast_upload(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """
     Upload Excel file for bulk forecasting
     
@@ -384,40 +501,36 @@ async def bulk_forecast_upload(file: UploadFile = File(...)):
                 detail="Invalid file type. Please upload an Excel file (.xlsx or .xls)"
             )
         
-        # Save uploaded file to temp location
-        temp_dir = tempfile.gettempdir()
-        input_path = os.path.join(temp_dir, f"upload_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
-        
-        with open(input_path, 'wb') as f:
-            f.write(await file.read())
-        
-        # Process bulk forecast using same ratios object as single-day endpoint
-        output_path = process_bulk_forecast(
-            input_path,
-            output_dir=temp_dir,
-            completion_ratios_df=completion_ratios_df
-        )
+        # Read the upload straight from its spooled temp file (memory for small
+        # uploads, disk once rolled over) instead of copying it to another file
+        await file.seek(0)
         
-        if not os.path.exists(output_path):
-            raise HTTPException(status_code=500, detail="Forecast processing failed")
-
-        output_filename = os.path.basename(output_path)
-        with open(output_path, "rb") as f:
-            output_bytes = f.read()
-
+        # Private output directory per request: the workbook name only depends on the
+        # upload date, so concurrent uploads must not share a path
+        output_dir = tempfile.mkdtemp(prefix="bulk_forecast_")
         try:
-            _persist_bulk_run(file.filename, output_filename, output_bytes)
-            _enforce_bulk_history_retention()
-        except Exception as db_error:
-            print(f"⚠️  Warning: Could not persist bulk forecast metadata: {db_error}")
+            # Process bulk forecast using same ratios object as single-day endpoint
+            output_path = process_bulk_forecast(
+                file.file,
+                output_dir=output_dir,
+                completion_ratios_df=completion_ratios_df,
+                input_filename=file.filename
+            )
+            
+            if not os.path.exists(output_path):
+                raise HTTPException(status_code=500, detail="Forecast processing failed")
+        except Exception:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            raise
+
+        # Stored to MongoDB from disk once the response has been streamed, then deleted
+        background_tasks.add_task(_record_bulk_run, file.filename, output_path)
         
-        # Return output file
-        return Response(
-            content=output_bytes,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename={output_filename}"
-            }
+        # Return output file (streamed from disk, never loaded into memory here)
+        return FileResponse(
+            path=output_path,
+            filename=os.path.basename(output_path),
+            media_type=BULK_OUTPUT_CONTENT_TYPE
         )
         
     except HTTPException:
@@ -537,7 +650,7 @@ async def health_check():
 
 
 @app.get("/single/history")
-async def single_history(limit: int = 20):
+def single_history(limit: int = 20):
     """List previously generated single-day forecast records saved in MongoDB."""
     if not mongo_db:
         return JSONResponse(
@@ -574,8 +687,8 @@ async def single_history(limit: int = 20):
         history_items.append(
             {
                 "id": str(record.get("_id")),
-                "created_at": created_at.isoformat() if created_at else None,
-                "updated_at": updated_at.isoformat() if updated_at else None,
+                "created_at": created_at,
+                "updated_at": updated_at,
                 "stay_date": input_payload.get("stay_date"),
                 "today_date": input_payload.get("today_date"),
                 "event_level": input_payload.get("event_level"),
@@ -586,8 +699,8 @@ async def single_history(limit: int = 20):
             }
         )
 
-    return JSONResponse(
-        content={
+    return _orjson_response(
+        {
             "status": "success",
             "data": history_items,
         }
@@ -595,15 +708,12 @@ async def single_history(limit: int = 20):
 
 
 @app.get("/single/history/{record_id}")
-async def single_history_detail(record_id: str):
+def single_history_detail(record_id: str):
     """Get one previously generated single-day forecast record by ID."""
     if not mongo_db:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
 
-    try:
-        object_id = ObjectId(record_id)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid record id")
+    object_id = _parse_object_id(record_id)
 
     record = mongo_db["single_day_forecasts"].find_one(
         {"_id": object_id},
@@ -614,13 +724,13 @@ async def single_history_detail(record_id: str):
 
     created_at = record.get("created_at")
     updated_at = record.get("updated_at")
-    return JSONResponse(
-        content={
+    return _orjson_response(
+        {
             "status": "success",
             "data": {
                 "id": str(record.get("_id")),
-                "created_at": created_at.isoformat() if created_at else None,
-                "updated_at": updated_at.isoformat() if updated_at else None,
+                "created_at": created_at,
+                "updated_at": updated_at,
                 "source": record.get("source"),
                 "input": record.get("input") or {},
                 "output": record.get("output") or {},
@@ -631,15 +741,12 @@ async def single_history_detail(record_id: str):
 
 
 @app.patch("/single/history/{record_id}/note")
-async def update_single_history_note(record_id: str, payload: SingleHistoryNoteUpdate):
+def update_single_history_note(record_id: str, payload: SingleHistoryNoteUpdate):
     """Update note text for one previously generated single-day forecast record."""
     if not mongo_db:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
 
-    try:
-        object_id = ObjectId(record_id)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid record id")
+    object_id = _parse_object_id(record_id)
 
     note_text = payload.note.strip()
     if not note_text:
@@ -668,15 +775,12 @@ async def update_single_history_note(record_id: str, payload: SingleHistoryNoteU
 
 
 @app.delete("/single/history/{record_id}/note")
-async def delete_single_history_note(record_id: str):
+def delete_single_history_note(record_id: str):
     """Delete note text for one previously generated single-day forecast record."""
     if not mongo_db:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
 
-    try:
-        object_id = ObjectId(record_id)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid record id")
+    object_id = _parse_object_id(record_id)
 
     update_result = mongo_db["single_day_forecasts"].update_one(
         {"_id": object_id},
@@ -701,7 +805,7 @@ async def delete_single_history_note(record_id: str):
 
 
 @app.get("/bulk/history")
-async def bulk_history(limit: int = 20):
+def bulk_history(limit: int = 20):
     """List previously generated bulk forecast outputs saved in MongoDB."""
     if not mongo_db:
         return JSONResponse(
@@ -734,15 +838,15 @@ async def bulk_history(limit: int = 20):
         history_items.append(
             {
                 "id": str(record.get("_id")),
-                "created_at": created_at.isoformat() if created_at else None,
+                "created_at": created_at,
                 "input_filename": record.get("input_filename"),
                 "output_filename": record.get("output_filename"),
                 "size_bytes": record.get("size_bytes"),
             }
         )
 
-    return JSONResponse(
-        content={
+    return _orjson_response(
+        {
             "status": "success",
             "data": history_items,
         }
@@ -750,62 +854,64 @@ async def bulk_history(limit: int = 20):
 
 
 @app.get("/bulk/download/{record_id}")
-async def download_past_bulk_output(record_id: str):
+def download_past_bulk_output(record_id: str):
     """Download a previously generated bulk forecast output by history record ID."""
     if not mongo_db:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
 
-    try:
-        object_id = ObjectId(record_id)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid record id")
+    object_id = _parse_object_id(record_id)
 
     record = mongo_db["bulk_forecasts"].find_one({"_id": object_id})
     if not record:
         raise HTTPException(status_code=404, detail="Record not found")
 
+    output_filename = record.get("output_filename") or f"bulk_output_{record_id}.xlsx"
+    content_type = record.get("content_type") or BULK_OUTPUT_CONTENT_TYPE
+    headers = {"Content-Disposition": f"attachment; filename={output_filename}"}
+
+    if record.get("file_id") is not None:
+        try:
+            grid_out = _bulk_output_fs().get(record["file_id"])
+        except NoFile:
+            raise HTTPException(status_code=404, detail="Stored file data not found for this record")
+
+        # GridOut yields the file chunk by chunk, so it is never held in memory whole
+        return StreamingResponse(grid_out, media_type=content_type, headers=headers)
+
+    # Records saved before GridFS storage keep the bytes inline
     output_bytes = record.get("output_file_bytes")
     if not output_bytes:
         raise HTTPException(status_code=404, detail="Stored file data not found for this record")
 
-    output_filename = record.get("output_filename") or f"bulk_output_{record_id}.xlsx"
-    content_type = record.get("content_type") or "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-
-    return Response(
-        content=bytes(output_bytes),
-        media_type=content_type,
-        headers={
-            "Content-Disposition": f"attachment; filename={output_filename}"
-        },
-    )
+    # Slice through a memoryview so the stored Binary is never copied whole
+    return StreamingResponse(_iter_chunks(output_bytes), media_type=content_type, headers=headers)
 
 
 @app.delete("/bulk/history/{record_id}")
-async def delete_bulk_history_record(record_id: str):
+def delete_bulk_history_record(record_id: str):
     """Delete one bulk history record (including stored file bytes) by ID."""
     if not mongo_db:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
 
-    try:
-        object_id = ObjectId(record_id)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid record id")
+    object_id = _parse_object_id(record_id)
 
-    delete_result = mongo_db["bulk_forecasts"].delete_one({"_id": object_id})
-    if delete_result.deleted_count == 0:
+    record = mongo_db["bulk_forecasts"].find_one({"_id": object_id}, {"_id": 1, "file_id": 1})
+    if not record:
         raise HTTPException(status_code=404, detail="Record not found")
 
+    deleted_count = _delete_bulk_records([record])
+
     return JSONResponse(
         content={
             "status": "success",
             "message": "Bulk history record deleted",
-            "data": {"deleted_count": delete_result.deleted_count},
+            "data": {"deleted_count": deleted_count},
         }
     )
 
 
 @app.delete("/bulk/history")
-async def delete_old_bulk_history(older_than_days: int = 30, limit: int = 500):
+def delete_old_bulk_history(older_than_days: int = 30, limit: int = 500):
     """Delete old bulk history records to control MongoDB storage growth."""
     if not mongo_db:
         raise HTTPException(status_code=503, detail="MongoDB is not connected")
@@ -820,7 +926,7 @@ async def delete_old_bulk_history(older_than_days: int = 30, limit: int = 500):
         mongo_db["bulk_forecasts"]
         .find(
             {"created_at": {"$lt": cutoff_datetime}},
-            {"_id": 1},
+            {"_id": 1, "file_id": 1},
         )
         .sort("created_at", 1)
         .limit(limit)
@@ -835,15 +941,14 @@ async def delete_old_bulk_history(older_than_days: int = 30, limit: int = 500):
             }
         )
 
-    ids_to_delete = [record["_id"] for record in old_records]
-    delete_result = mongo_db["bulk_forecasts"].delete_many({"_id": {"$in": ids_to_delete}})
+    deleted_count = _delete_bulk_records(old_records)
 
     return JSONResponse(
         content={
             "status": "success",
             "message": "Old bulk history records deleted",
             "data": {
-                "deleted_count": delete_result.deleted_count,
+                "deleted_count": deleted_count,
                 "older_than_days": older_than_days,
                 "applied_limit": limit,
             },
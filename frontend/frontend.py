@@ -133,11 +133,14 @@ with tab1:
     st.header("Single-Day Occupancy Forecast")
     st.write("Get forecast and pricing recommendations for a specific date")
     
-    # Get input options from backend
-    options_response = run_backend("/options")
+    # Get input options from backend (static while the API runs, so fetch once per session)
+    if st.session_state.get("input_options") is None:
+        options_response = run_backend("/options")
+        if options_response and options_response.status_code == 200:
+            st.session_state["input_options"] = options_response.json()['data']
+    options = st.session_state.get("input_options")
     
-    if options_response and options_response.status_code == 200:
-        options = options_response.json()['data']
+    if options:
         
         col1, col2 = st.columns(2)
         
@@ -535,12 +538,18 @@ with tab2:
     st.write("Download the template with current + forecast columns. Fill only the current occupancy columns.")
     
     if st.button("⬇️ Download Template", type="secondary"):
-        response = run_backend("/bulk/template")
+        # Template only changes with its prefilled upload date; reuse today's copy
+        template_day = datetime.now().strftime('%Y%m%d')
+        if st.session_state.get("template_day") != template_day:
+            response = run_backend("/bulk/template")
+            if response and response.status_code == 200:
+                st.session_state["template_bytes"] = response.content
+                st.session_state["template_day"] = template_day
         
-        if response and response.status_code == 200:
+        if st.session_state.get("template_day") == template_day:
             st.download_button(
                 label="💾 Save Template",
-                data=response.content,
+                data=st.session_state["template_bytes"],
                 file_name="occupancy_template.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             )
@@ -562,9 +571,10 @@ with tab2:
         
         if st.button("🔮 Generate Bulk Forecast", type="primary"):
             with st.spinner("Processing bulk forecast... This may take a moment."):
-                # Prepare file for upload
+                # Prepare file for upload (streamed from the upload buffer, no extra copy)
+                uploaded_file.seek(0)
                 files = {
-                    'file': (uploaded_file.name, uploaded_file.getvalue(), 
+                    'file': (uploaded_file.name, uploaded_file, 
                             'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
                 }
                 